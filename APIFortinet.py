@@ -5,6 +5,11 @@ Author: Hunter R.
 Date: 2025-11-12
 """
 import requests, logging, sys, json
+import concurrent.futures, threading, time
+import urllib.parse
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ️ Configure logging
 logging.basicConfig(
@@ -15,12 +20,104 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+class ResponseCache:
+    """LRU cache of successful GET responses for FortiGateAPI, keyed by (api, path, params).
+
+    ttls maps a path prefix to a TTL in seconds, e.g. {'cmdb/firewall/address': 60, 'monitor/': 5}.
+    The longest matching prefix wins and default_ttl is used otherwise. A TTL of 0 disables caching
+    for that prefix. Expired entries that carried an ETag are revalidated with If-None-Match.
+    """
+
+    def __init__(self, max_entries=256, default_ttl=30, ttls=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = sorted((ttls or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._entries = OrderedDict()   # key -> (expires, response)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(api, path, params):
+        # requests accepts list values for repeated query params; tuples keep the key hashable.
+        return (api, path.strip('/'),
+                tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                             for name, value in (params or {}).items())))
+
+    def ttl_for(self, path):
+        path = path.strip('/')
+        for prefix, ttl in self.ttls:
+            if path.startswith(prefix.strip('/')):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key):
+        """Returns (response, fresh). A stale response is returned so the caller can revalidate it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            expires, response = entry
+            if time.monotonic() < expires:
+                self.hits += 1
+                return response, True
+            self.misses += 1
+            return response, False
+
+    def store(self, key, response):
+        ttl = self.ttl_for(key[1])
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revalidate(self, key, response):
+        """A 304 came back for a stale entry: count it and keep the response for another TTL."""
+        with self._lock:
+            self.revalidated += 1
+        self.store(key, response)
+
+    def invalidate(self, api, path):
+        """Drop every entry at, above or below path, e.g. a put to .../address/h1 clears .../address/."""
+        path = path.strip('/')
+        with self._lock:
+            stale = [key for key in self._entries
+                     if key[0] == api and (key[1].startswith(path) or path.startswith(key[1]))]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'invalidations': self.invalidations,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0}
+
+
 class FortiGateAPI:
-    def __init__(self, ip, headers, verify=False, proxies=None, disable_warnings=True, secure=True):
+    def __init__(self, ip, headers, verify=False, proxies=None, disable_warnings=True, secure=True,
+                 pool_size=10, retries=3, backoff_factor=0.5, cache=None):
         self._secure=secure
         self.verify = verify
         self.ip = ip
         self.proxies=proxies
+        self.pool_size = pool_size
+        self.cache = cache
+        self._closed = False
 
         if self._secure:
             self.url_prefix = 'https://' + self.ip
@@ -41,38 +138,63 @@ class FortiGateAPI:
         if disable_warnings:
             requests.packages.urllib3.disable_warnings()
 
-        authenticatedSession = requests.Session()
-        authenticatedSession.post(self.url_prefix + '/logincheck', headers=self.headers, verify=self.verify)
-        self.cookies = authenticatedSession.cookies
+        # One keep-alive session for every call so polling reuses the same TCP/TLS connections.
+        self.session = self._build_session(pool_size, retries, backoff_factor)
+        self.session.headers.update(self.headers)
+        self.headers = self.session.headers
+
+        self.session.post(self.url_prefix + '/logincheck')
+        self.cookies = self.session.cookies
 
         for cookie in self.cookies:
             if cookie.name == "ccsrftoken":
                 csrftoken = cookie.value[1:-1]  # token stored as a list
                 self.headers['X-CSRFTOKEN'] = csrftoken
 
+    def _build_session(self, pool_size, retries, backoff_factor):
+        session = requests.Session()
+        # Only reads are retried on a status code: a FortiOS 500 usually means the write was rejected,
+        # and the caller needs that response (and its error body), not a RetryError.
+        retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=backoff_factor,
+                      status_forcelist=(429, 502, 503, 504), allowed_methods=frozenset({'GET', 'HEAD'}),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.verify = self.verify
+        if self.proxies:
+            session.proxies.update(self.proxies)
+        return session
+
     def __enter__(self):
         return self
 
-    def __del__(self):
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
         try:
-            requests.post(self.url_prefix + '/logout', verify=self.verify, cookies=self.cookies, proxies=self.proxies)
+            self.session.post(self.url_prefix + '/logout')
+            self.session.close()
         except AttributeError:
             print ("Looks like connection to "+self.ip+" has never been established")
 
+    def __del__(self):
+        self.close()
+
     def __exit__(self, *args):
-        pass
+        self.close()
 
     def login(self, username, password):
         # Might need to use
         # data='username=' + user + '&secretkey=' + password + '&ajax=1'
         # ajax=1&username=here&secretkey=here%23
 
-        altAuth = requests.post(self.url_prefix + '/logincheck',data='ajax=1' + '&username=' + username + '&secretkey=' + password,
-                                headers=self.headers, verify=self.verify)
-        self.cookies = altAuth.cookies
+        altAuth = self.session.post(self.url_prefix + '/logincheck',data='ajax=1' + '&username=' + username + '&secretkey=' + password)
+        self.cookies = self.session.cookies
         logging.info(f'Logged in and received cookies -> {altAuth.cookies.get_dict()}')
 
-        for cookie in self.cookies:
+        for cookie in altAuth.cookies:
             if "ccsrftoken" in cookie.name:
                 csrftoken = cookie.value
                 self.headers['X-CSRFTOKEN'] = csrftoken
@@ -84,29 +206,202 @@ class FortiGateAPI:
             #    csrftoken = cookie.value[1:-1]  # token stored as a list
             #    self.headers['X-CSRFTOKEN'] = csrftoken
 
-    def get(self, path, api='v2', params=None):
+    def get(self, path, api='v2', params=None, use_cache=True):
         if isinstance(path, list):
             path = '/'.join(path) + '/'
-        return requests.get(self.url_prefix + '/api/' + api + '/' + path, cookies=self.cookies, verify=self.verify, headers=self.headers, params=params)
+        if self.cache is None or not use_cache:
+            return self.session.get(self.url_prefix + '/api/' + api + '/' + path, params=params)
+
+        key = self.cache.make_key(api, path, params)
+        cached, fresh = self.cache.lookup(key)
+        if fresh:
+            return cached
+
+        headers = None
+        if cached is not None and cached.headers.get('ETag'):
+            headers = {'If-None-Match': cached.headers['ETag']}
+        response = self.session.get(self.url_prefix + '/api/' + api + '/' + path, params=params, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            self.cache.revalidate(key, cached)
+            return cached
+        if response.status_code == 200:
+            self.cache.store(key, response)
+        return response
+
+    def _invalidate(self, path, api):
+        if self.cache is not None:
+            self.cache.invalidate(api, path)
+
+    def iter_table(self, path, api='v2', params=None, page_size=1000):
+        """Yield CMDB table records one at a time, paging with FortiOS start/count.
 
-    def put(self, path, api='v2', params=None, data=None):
+        Only one page of results is held in memory at once, so large tables can be streamed to disk.
+        Paging stops on a short or empty page, or when a page starts with the same record as the
+        previous one (an endpoint that ignores start/count would otherwise be read forever).
+        """
+        params = dict(params or {})
+        start = 0
+        previousFirst = None
+        while True:
+            params['start'] = start
+            params['count'] = page_size
+            # Pages are read once; caching them would keep the whole table in the LRU.
+            response = self.get(path, api=api, params=params, use_cache=False)
+            if response.status_code != 200:
+                logging.info('Response Code -> {} at start={}\n'.format(response.status_code, start))
+                response.raise_for_status()
+                return
+            results = response.json().get('results', [])
+            if not results:
+                return
+            if start and results[0] == previousFirst:
+                logging.info('{} ignored start={}; stopped paging to avoid repeating records.'.format(path, start))
+                return
+            previousFirst = results[0]
+            yield from results
+            if len(results) < page_size:
+                return
+            start += len(results)
+
+    # Writes invalidate the cache after the request completes (or fails), so a get running
+    # concurrently cannot put the old data back for a full TTL.
+    def put(self, path, api='v2', params=None, data=None, headers=None):
         if isinstance(path, list):
             path = '/'.join(path) + '/'
-        return requests.put(self.url_prefix + '/api/' + api + '/' + path, headers=self.headers,cookies=self.cookies,
-                            verify=self.verify, proxies=self.proxies, params=params, json={'json': data})
+        try:
+            return self.session.put(self.url_prefix + '/api/' + api + '/' + path, params=params,
+                                    json={'json': data}, headers=headers)
+        finally:
+            self._invalidate(path, api)
 
-    def post(self, path, api='v2', params=None, data=None, files=None):
+    def post(self, path, api='v2', params=None, data=None, files=None, headers=None):
         if isinstance(path, list):
             path = '/'.join(path) + '/'
-        return requests.post(self.url_prefix + '/api/'+api+'/'+path, headers=self.headers,cookies=self.cookies,
-                            verify=self.verify, proxies=self.proxies, params=params, json={'json': data},
-                            files=files)
+        try:
+            return self.session.post(self.url_prefix + '/api/'+api+'/'+path, params=params, json={'json': data},
+                                     files=files, headers=headers)
+        finally:
+            self._invalidate(path, api)
 
     def delete(self, path, api='v2', params=None, data=None):
         if isinstance(path, list):
             path = '/'.join(path) + '/'
-        return requests.delete(self.url_prefix + '/api/'+api+'/'+path, headers=self.header,cookies=self.cookies,
-                            verify=self.verify, proxies=self.proxies, params=params, json={'json': data})
+        try:
+            return self.session.delete(self.url_prefix + '/api/'+api+'/'+path, params=params, json={'json': data})
+        finally:
+            self._invalidate(path, api)
+
+    def _transaction(self, action, api='v2', timeout=None, transaction_id=None):
+        data = {'timeout': timeout} if timeout is not None else None
+        headers = {'X-TRANSACTION-ID': str(transaction_id)} if transaction_id is not None else None
+        response = self.session.post(self.url_prefix + '/api/' + api + '/cmdb/',
+                                     params={'action': 'transaction-' + action}, json=data, headers=headers)
+        return response
+
+    def start_transaction(self, api='v2', timeout=300):
+        """Start a CMDB transaction (FortiOS 6.4+). Returns the transaction id, or None if unsupported.
+
+        The id is not put on the shared session headers; pass it as X-TRANSACTION-ID on each request
+        that belongs to the transaction, so other requests on this session stay outside it.
+        """
+        response = self._transaction('start', api=api, timeout=timeout)
+        if response.status_code != 200:
+            logging.info('Transactions unavailable on {} -> Response Code {}'.format(self.ip, response.status_code))
+            return None
+        return response.json().get('results', {}).get('transaction_id')
+
+    def commit_transaction(self, transaction_id, api='v2'):
+        response = self._transaction('commit', api=api, transaction_id=transaction_id)
+        # Reads made during the transaction saw the old config.
+        if self.cache is not None:
+            self.cache.clear()
+        return response
+
+    def abort_transaction(self, transaction_id, api='v2'):
+        return self._transaction('abort', api=api, transaction_id=transaction_id)
+
+    def _write_one(self, method, path, obj, key, api, params, headers):
+        name = obj.get(key) if isinstance(obj, dict) else None
+        result = {'key': name, 'status_code': None, 'status': 'failed', 'error': ''}
+        try:
+            if method == 'put':
+                # Names such as 'net 10.0.0.0/24' must stay one path segment.
+                response = self.put(path.rstrip('/') + '/' + urllib.parse.quote(str(name), safe=''),
+                                    api=api, params=params, data=obj,
+                                    headers=headers)
+            else:
+                response = self.post(path, api=api, params=params, data=obj, headers=headers)
+            result['status_code'] = response.status_code
+            if response.status_code == 200:
+                result['status'] = 'success'
+            else:
+                result['error'] = response.text[:200]
+        except requests.RequestException as err:
+            result['error'] = '{}: {}'.format(type(err).__name__, err)
+        return result
+
+    def batch_write(self, path, objects, method='post', api='v2', params=None, key='name',
+                    workers=4, transaction=True, commit_partial=False):
+        """Create (post) or update (put) many CMDB objects with bounded concurrency.
+
+        Every object is attempted and gets a result dict, failures do not stop the batch. When the
+        firewall supports transactions the batch is committed as one unit, or aborted if any object
+        failed and commit_partial is False.
+        """
+        if isinstance(path, list):
+            path = '/'.join(path) + '/'
+        if method not in ('post', 'put'):
+            raise ValueError("method must be 'post' or 'put'.")
+        objects = list(objects)
+        if method == 'put':
+            missing = [index for index, obj in enumerate(objects) if not isinstance(obj, dict) or obj.get(key) is None]
+            if missing:
+                raise ValueError("put needs '{}' on every object; missing at index {}.".format(key, missing[:10]))
+
+        transaction_id = self.start_transaction(api=api) if transaction else None
+        headers = {'X-TRANSACTION-ID': str(transaction_id)} if transaction_id is not None else None
+        # No point running more threads than the session has pooled connections.
+        workers = max(1, min(workers, self.pool_size))
+        settled = transaction_id is None
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(lambda obj: self._write_one(method, path, obj, key, api, params, headers),
+                                            objects))
+
+            failed = [item for item in results if item['status'] != 'success']
+            if transaction_id is not None:
+                if failed and not commit_partial:
+                    settled = True
+                    self.abort_transaction(transaction_id, api=api)
+                    for item in results:
+                        if item['status'] == 'success':
+                            item['status'] = 'rolled_back'
+                    logging.info('Aborted transaction {} on {}: {} of {} objects failed.'.format(
+                        transaction_id, self.ip, len(failed), len(results)))
+                else:
+                    settled = True
+                    response = self.commit_transaction(transaction_id, api=api)
+                    if response.status_code != 200:
+                        logging.info('Commit of transaction {} failed -> Response Code {}'.format(transaction_id, response.status_code))
+                        for item in results:
+                            if item['status'] == 'success':
+                                item['status'] = 'failed'
+                                item['error'] = 'Transaction commit failed.'
+        finally:
+            if not settled:
+                # Anything that escaped above (a bug, KeyboardInterrupt) must not leave the transaction open.
+                try:
+                    self.abort_transaction(transaction_id, api=api)
+                    logging.info('Aborted transaction {} on {} after an error.'.format(transaction_id, self.ip))
+                except requests.RequestException as err:
+                    logging.info('Could not abort transaction {} on {} -> {}'.format(transaction_id, self.ip, err))
+
+        # Counted after the commit, which can turn successes into failures.
+        succeeded = sum(item['status'] == 'success' for item in results)
+        logging.info('Batch {} to {}: {} succeeded, {} failed.'.format(
+            method, path, succeeded, len(results) - succeeded))
+        return results
 
     def print_data(self, data):
         if data.status_code == 200:
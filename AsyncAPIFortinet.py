@@ -0,0 +1,144 @@
+"""
+Filename: AsyncAPIFortinet.py
+Description: Async counterpart to APIFortinet.FortiGateAPI for polling many FortiGates in parallel.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+import asyncio, logging, sys, json
+import aiohttp
+
+# ️ Configure logging
+logging.basicConfig(
+    format="%(asctime)s [%(levelname)s][AsyncAPIFortinet.py] %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ],
+    level=logging.INFO
+)
+
+class AsyncFortiGateAPI:
+    """Same get/put/post/delete/login surface as FortiGateAPI, but every call is a coroutine.
+
+    Each instance owns one aiohttp session. max_concurrency caps in-flight requests to this
+    firewall so a sweep across many devices does not overload any single management plane.
+    """
+
+    def __init__(self, ip, headers=None, verify=False, secure=True, max_concurrency=10, timeout=30, proxy=None):
+        self._secure = secure
+        self.verify = verify
+        self.ip = ip
+        self.proxy = proxy
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self._max_concurrency = max(1, int(max_concurrency))
+        self.session = None
+
+        if self._secure:
+            self.url_prefix = 'https://' + self.ip
+        else:
+            self.url_prefix = 'http://' + self.ip
+
+        if headers is None:
+            self.headers = {}
+        elif isinstance(headers, dict):
+            self.headers = dict(headers)
+        else:
+            logging.info(f'Invalid headers type -> {type(headers)}. Use type dict.\n')
+            self.headers = {}
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def open(self):
+        if self.session is not None:
+            return
+        connector = aiohttp.TCPConnector(limit=self._max_concurrency, ssl=None if self.verify else False)
+        self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout, connector=connector)
+        async with self.session.post(self.url_prefix + '/logincheck', proxy=self.proxy) as response:
+            await response.read()
+        self._update_csrf()
+
+    async def close(self):
+        if self.session is None:
+            return
+        try:
+            async with self.session.post(self.url_prefix + '/logout', proxy=self.proxy) as response:
+                await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            logging.info(f'Logout from {self.ip} failed -> {err}')
+        finally:
+            await self.session.close()
+            self.session = None
+
+    def _update_csrf(self):
+        for cookie in self.session.cookie_jar:
+            if "ccsrftoken" in cookie.key:
+                csrftoken = cookie.value.strip('"')
+                self.headers['X-CSRFTOKEN'] = csrftoken
+                self.session.headers['X-CSRFTOKEN'] = csrftoken
+
+    async def login(self, username, password):
+        await self.open()
+        data = {'ajax': '1', 'username': username, 'secretkey': password}
+        async with self.session.post(self.url_prefix + '/logincheck', data=data, proxy=self.proxy) as response:
+            await response.read()
+        self._update_csrf()
+        logging.info(f'Logged in to {self.ip}')
+
+    def _url(self, path, api):
+        if isinstance(path, list):
+            path = '/'.join(path) + '/'
+        return self.url_prefix + '/api/' + api + '/' + path
+
+    async def _request(self, method, path, api='v2', params=None, data=None):
+        """Returns (status, parsed JSON or None). The body is read inside the concurrency limit."""
+        await self.open()
+        kwargs = {'params': params, 'proxy': self.proxy}
+        if method != 'GET':
+            kwargs['json'] = {'json': data}
+        async with self._semaphore:
+            async with self.session.request(method, self._url(path, api), **kwargs) as response:
+                text = await response.text()
+        try:
+            body = json.loads(text) if text else None
+        except ValueError:
+            body = None
+        return response.status, body
+
+    async def get(self, path, api='v2', params=None):
+        return await self._request('GET', path, api=api, params=params)
+
+    async def put(self, path, api='v2', params=None, data=None):
+        return await self._request('PUT', path, api=api, params=params, data=data)
+
+    async def post(self, path, api='v2', params=None, data=None):
+        return await self._request('POST', path, api=api, params=params, data=data)
+
+    async def delete(self, path, api='v2', params=None, data=None):
+        return await self._request('DELETE', path, api=api, params=params, data=data)
+
+
+async def _poll_one(ip, headers, paths, max_concurrency, timeout):
+    results = {'ip': ip, 'status': 'success', 'data': {}, 'error': ''}
+    try:
+        async with AsyncFortiGateAPI(ip, headers=headers, max_concurrency=max_concurrency, timeout=timeout) as api:
+            responses = await asyncio.gather(*(api.get(path) for path in paths))
+        for path, (status, body) in zip(paths, responses):
+            results['data'][path] = body.get('results') if status == 200 and isinstance(body, dict) else None
+            if status != 200:
+                results['status'] = 'partial'
+                results['error'] += f'{path} -> {status}. '
+    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        results['status'] = 'failed'
+        results['error'] = f'{type(err).__name__}: {err}'
+        logging.error(f'{ip} -> {results["error"]}')
+    return results
+
+
+async def pollFirewalls(ips, headers, paths, max_concurrency=10, timeout=30):
+    """GET every path from every firewall concurrently and return one result dict per firewall."""
+    return await asyncio.gather(*(_poll_one(ip, dict(headers or {}), paths, max_concurrency, timeout) for ip in ips))
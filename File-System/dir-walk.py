@@ -1,44 +1,106 @@
 """
 Filename: dir-walk.py
-Description: Brief overview of what this script does.
+Description: Walk a directory tree and stream its directories and files as JSON lines, or diff it
+             against a persistent index with --index.
 Author: Hunter/Ness27
 Date: 2025-08-09
 """
 
 import sys
 import os
+import argparse
+import datetime
+import json
+from walker import WalkFilter, walk
+from walkIndex import WalkIndex
+
+
+def parseTime(value):
+    """Accept epoch seconds or an ISO date/time (e.g. 2025-08-09 or 2025-08-09T12:00)."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def callParser():
+    parser = argparse.ArgumentParser(prog='dir-walk.py',
+                                     add_help=True,
+                                     description='Walk a directory tree with os.scandir across a thread pool.',
+                                     epilog='\nEnd of the help text.')
+    parser.add_argument('directory', nargs='?', default=None, help='Directory to walk. Prompts when omitted.')
+    parser.add_argument('-x', '--exclude', metavar='<glob>', action='append', dest='exclude', default=None,
+                        help='[Optional] Directory name to skip without descending. Repeatable. Default = .git')
+    parser.add_argument('-g', '--glob', metavar='<glob>', action='append', dest='include', default=None,
+                        help='[Optional] Only report files whose name matches. Repeatable.')
+    parser.add_argument('--min-size', metavar='<bytes>', type=int, dest='min_size', help='[Optional] Minimum file size.')
+    parser.add_argument('--max-size', metavar='<bytes>', type=int, dest='max_size', help='[Optional] Maximum file size.')
+    parser.add_argument('--newer', metavar='<time>', type=parseTime, dest='newer', help='[Optional] Modified at or after.')
+    parser.add_argument('--older', metavar='<time>', type=parseTime, dest='older', help='[Optional] Modified at or before.')
+    parser.add_argument('-w', '--workers', metavar='<N>', type=int, dest='workers', default=8,
+                        help='[Optional] Directories scanned in parallel. Default = 8')
+    parser.add_argument('--files-only', action='store_true', dest='files_only', help='[Optional] Do not emit directory records.')
+    parser.add_argument('-i', '--index', metavar='<db>', dest='index',
+                        help='[Optional] SQLite index file. Report only files added/removed/modified since the last run.')
+    parser.add_argument('--hash', action='store_true', dest='hash',
+                        help='[Optional] With --index, hash new/changed files so touched-but-identical files are not reported.')
+    parser.add_argument('--trust-dir-mtime', action='store_true', dest='trust_dir_mtime',
+                        help='[Optional] With --index, skip files in directories whose mtime is unchanged. '
+                             'Misses in-place edits; fine for trees written by copy/rename.')
+    return parser.parse_args()
+
+
+def runIndex(args, selectDir):
+    """Update the index for selectDir and write one JSON line per change, then a totals line."""
+    exclude = args.exclude if args.exclude is not None else ['.git']
+    write = sys.stdout.write
+    with WalkIndex(args.index, use_hash=args.hash, workers=args.workers) as index:
+        changes = index.update(selectDir, exclude=exclude, trust_dir_mtime=args.trust_dir_mtime)
+    for kind in ('added', 'removed', 'modified'):
+        for path, size, mtimeNs in sorted(changes[kind]):
+            write(json.dumps({'type': kind, 'path': path, 'size': size, 'mtime': mtimeNs / 1e9}) + '\n')
+    for path, message in changes['errors']:
+        write(json.dumps({'type': 'error', 'path': path, 'error': message}) + '\n')
+    totals = dict(changes['stats'], added=len(changes['added']), removed=len(changes['removed']),
+                  modified=len(changes['modified']), errors=len(changes['errors']))
+    write(json.dumps({'type': 'totals', **totals}) + '\n')
+
 
 def main():
     """Main Function."""
+    args = callParser()
 
-    selectDir = input('Enter a directory to walk: ')
+    selectDir = args.directory if args.directory is not None else input('Enter a directory to walk: ')
     if selectDir == '' or (not os.path.exists(selectDir)):
-        print('<{}> is not a valid directory.'.format(selectDir))
+        print('<{}> is not a valid directory.'.format(selectDir), file=sys.stderr)
         selectDir = os.getcwd()
     else:
         selectDir = os.path.abspath(selectDir)
 
-    print('\nCurrent Directory-> {}\n'.format(selectDir))
+    print('Current Directory-> {}'.format(selectDir), file=sys.stderr)
+
+    if args.index:
+        runIndex(args, selectDir)
+        return
 
-    skipdir = '.git'
-    print(' ')
-    for directory, subdirectories, files in os.walk(selectDir):
-        if skipdir in directory:
+    walkFilter = WalkFilter(include=args.include, min_size=args.min_size, max_size=args.max_size,
+                            newer_than=args.newer, older_than=args.older)
+    exclude = args.exclude if args.exclude is not None else ['.git']
+    totals = {}
+    write = sys.stdout.write
+    for kind, path, size, extra in walk(selectDir, exclude=exclude, walkFilter=walkFilter,
+                                        workers=args.workers, totals=totals):
+        if kind == 'dir' and args.files_only:
             continue
-        else:
-            print('Directory -> {}\t'.format(directory))
-            if len(subdirectories) > 0:
-                for item in subdirectories:
-                    print('Subdirectory -> {}'.format(item))
-            else:
-                print('Subdirectory -> NONE')
-            if len(files) > 0:
-                for item in files:
-                    print('File -> {}'.format(item))
-            else:
-                print('File -> NONE')
-            print(' ')
+        record = {'type': kind, 'path': path}
+        if kind == 'file':
+            record['size'] = size
+            record['mtime'] = extra
+        elif kind == 'error':
+            record['error'] = extra
+        write(json.dumps(record) + '\n')
 
+    write(json.dumps({'type': 'totals', **totals}) + '\n')
 
 
 if __name__ == "__main__":
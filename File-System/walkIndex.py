@@ -0,0 +1,240 @@
+"""
+Filename: walkIndex.py
+Description: Persistent SQLite index of a directory tree that reports added, removed and modified files.
+Author: Hunter/Ness27
+Date: 2026-10-18
+"""
+
+import concurrent.futures
+import fnmatch
+import hashlib
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS files (
+    directory TEXT,
+    name TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    hash BLOB,
+    PRIMARY KEY (directory, name)
+) WITHOUT ROWID;
+"""
+
+
+def hashFile(path, chunkSize=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunkSize), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _excluded(name, exclude):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in exclude)
+
+
+def _childPrefix(path):
+    """The prefix every path below path starts with. A root such as '/' already ends in the separator."""
+    return path if path.endswith(os.sep) else path + os.sep
+
+
+def _checkDirectory(path, known, knownSubdirectories, knownMtime, exclude, useHash, trustDirMtime):
+    """Worker: bring one directory up to date against what the index knows about it.
+
+    known is {name: (size, mtime_ns, hash)} from the index. When the directory's own mtime is
+    unchanged no entry was added, removed or renamed, so the cached listing is reused instead of
+    calling scandir; the known files are still lstat'ed (unless trustDirMtime) because editing a
+    file in place does not touch its directory. Returns a dict consumed by WalkIndex.update().
+    """
+    result = {'path': path, 'mtime_ns': None, 'files': {}, 'subdirectories': [], 'error': None,
+              'scanned': False, 'stats': 0, 'hashed': 0}
+    try:
+        result['mtime_ns'] = os.stat(path).st_mtime_ns
+    except OSError as err:
+        result['error'] = str(err)
+        return result
+
+    if result['mtime_ns'] == knownMtime:
+        result['subdirectories'] = [sub for sub in knownSubdirectories
+                                    if not _excluded(os.path.basename(sub), exclude)]
+        if trustDirMtime:
+            result['files'] = dict(known)
+            return result
+        entries = []
+        for name in known:
+            try:
+                stat = os.lstat(os.path.join(path, name))
+            except OSError:
+                continue
+            entries.append((name, stat.st_size, stat.st_mtime_ns))
+        result['stats'] = len(known)
+    else:
+        result['scanned'] = True
+        entries = []
+        try:
+            with os.scandir(path) as iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not _excluded(entry.name, exclude):
+                                result['subdirectories'].append(entry.path)
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                        entries.append((entry.name, stat.st_size, stat.st_mtime_ns))
+                    except OSError:
+                        continue
+        except OSError as err:
+            result['error'] = str(err)
+            return result
+
+    for name, size, mtimeNs in entries:
+        previous = known.get(name)
+        digest = previous[2] if previous else None
+        if previous is None or previous[0] != size or previous[1] != mtimeNs:
+            digest = None
+            if useHash:
+                try:
+                    digest = hashFile(os.path.join(path, name))
+                    result['hashed'] += 1
+                except OSError:
+                    pass
+        result['files'][name] = (size, mtimeNs, digest)
+    return result
+
+
+class WalkIndex:
+    """SQLite-backed snapshot of one or more directory trees.
+
+    The first update() of a root records every directory and file; later calls only rescan
+    directories whose mtime moved and report the difference. With use_hash, content hashes
+    (blake2b) are computed for new or changed files only, and a file whose mtime moved but whose
+    content did not is refreshed silently instead of being reported as modified.
+    """
+
+    def __init__(self, database, use_hash=False, workers=8):
+        self.database = database
+        self.use_hash = use_hash
+        self.workers = max(1, workers)
+        self.connection = sqlite3.connect(database)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _load(self, root):
+        """Everything the index holds for root: ({dir: (parent, mtime_ns)}, {dir: {name: entry}})."""
+        # root + '/' .. root + '0' is every path below root, and keeps the primary key usable.
+        low = _childPrefix(root)
+        high = low[:-1] + chr(ord(os.sep) + 1)
+        directories = {}
+        for path, parent, mtimeNs in self.connection.execute(
+                "SELECT path, parent, mtime_ns FROM directories WHERE path = ? OR (path >= ? AND path < ?)",
+                (root, low, high)):
+            directories[path] = (parent, mtimeNs)
+        files = {}
+        for directory, name, size, mtimeNs, digest in self.connection.execute(
+                "SELECT directory, name, size, mtime_ns, hash FROM files "
+                "WHERE directory = ? OR (directory >= ? AND directory < ?)", (root, low, high)):
+            files.setdefault(directory, {})[name] = (size, mtimeNs, digest)
+        return directories, files
+
+    def update(self, root, exclude=('.git',), trust_dir_mtime=False):
+        """Bring the index for root up to date and return the changes since the previous update.
+
+        Returns {'added': [...], 'removed': [...], 'modified': [...], 'errors': [...], 'stats': {...}}
+        where files are (path, size, mtime_ns) tuples and errors are (path, message).
+        """
+        startTime = time.perf_counter()
+        root = os.path.abspath(root)
+        knownDirectories, knownFiles = self._load(root)
+        children = {}
+        for path, (parent, _) in knownDirectories.items():
+            children.setdefault(parent, []).append(path)
+
+        changes = {'added': [], 'removed': [], 'modified': [], 'errors': []}
+        stats = {'directories': 0, 'scanned': 0, 'files': 0, 'stats': 0, 'hashed': 0,
+                 'first_run': not knownDirectories}
+        visited = set()
+        directoryRows = []
+        fileRows = []
+        deletedFiles = []
+
+        def submit(executor, path):
+            known = knownFiles.get(path, {})
+            knownMtime = knownDirectories.get(path, (None, None))[1]
+            return executor.submit(_checkDirectory, path, known, children.get(path, ()), knownMtime,
+                                   tuple(exclude), self.use_hash, trust_dir_mtime)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {submit(executor, root)}
+            while pending:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    path = result['path']
+                    if result['error']:
+                        changes['errors'].append((path, result['error']))
+                        # Keep what we knew about an unreadable directory rather than calling it removed.
+                        if path in knownDirectories:
+                            visited.update(d for d in knownDirectories if d == path or d.startswith(_childPrefix(path)))
+                        continue
+                    visited.add(path)
+                    stats['directories'] += 1
+                    stats['scanned'] += result['scanned']
+                    stats['stats'] += result['stats']
+                    stats['hashed'] += result['hashed']
+                    for subdirectory in result['subdirectories']:
+                        pending.add(submit(executor, subdirectory))
+
+                    parent = os.path.dirname(path) if path != root else None
+                    if knownDirectories.get(path) != (parent, result['mtime_ns']):
+                        directoryRows.append((path, parent, result['mtime_ns']))
+
+                    known = knownFiles.get(path, {})
+                    for name, entry in result['files'].items():
+                        stats['files'] += 1
+                        previous = known.get(name)
+                        filePath = os.path.join(path, name)
+                        if previous is None:
+                            changes['added'].append((filePath, entry[0], entry[1]))
+                        elif previous == entry:
+                            continue
+                        elif self.use_hash and entry[2] is not None and entry[2] == previous[2]:
+                            pass  # touched, content unchanged
+                        else:
+                            changes['modified'].append((filePath, entry[0], entry[1]))
+                        fileRows.append((path, name) + entry)
+                    for name, entry in known.items():
+                        if name not in result['files']:
+                            changes['removed'].append((os.path.join(path, name), entry[0], entry[1]))
+                            deletedFiles.append((path, name))
+
+        removedDirectories = [path for path in knownDirectories if path not in visited]
+        for path in removedDirectories:
+            for name, entry in knownFiles.get(path, {}).items():
+                changes['removed'].append((os.path.join(path, name), entry[0], entry[1]))
+
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO directories VALUES (?, ?, ?)", directoryRows)
+            self.connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", fileRows)
+            self.connection.executemany("DELETE FROM files WHERE directory = ? AND name = ?", deletedFiles)
+            self.connection.executemany("DELETE FROM files WHERE directory = ?", [(p,) for p in removedDirectories])
+            self.connection.executemany("DELETE FROM directories WHERE path = ?", [(p,) for p in removedDirectories])
+
+        stats['seconds'] = round(time.perf_counter() - startTime, 5)
+        changes['stats'] = stats
+        return changes
@@ -0,0 +1,101 @@
+"""
+Filename: walker.py
+Description: Parallel os.scandir directory walker with pruning and file filters.
+Author: Hunter/Ness27
+Date: 2026-10-18
+"""
+
+import concurrent.futures
+import fnmatch
+import os
+import time
+
+
+class WalkFilter:
+    """File filters. Globs match the file name; sizes are bytes; times are epoch seconds."""
+
+    def __init__(self, include=None, min_size=None, max_size=None, newer_than=None, older_than=None):
+        self.include = list(include or [])
+        self.min_size = min_size
+        self.max_size = max_size
+        self.newer_than = newer_than
+        self.older_than = older_than
+
+    def matches(self, name, size, mtime):
+        if self.include and not any(fnmatch.fnmatch(name, pattern) for pattern in self.include):
+            return False
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        if self.newer_than is not None and mtime < self.newer_than:
+            return False
+        if self.older_than is not None and mtime > self.older_than:
+            return False
+        return True
+
+
+def scanDirectory(path, exclude=()):
+    """Read one directory. Returns (files, subdirectories, error).
+
+    files are (path, name, size, mtime); subdirectories are paths, with excluded names already
+    removed so they are never descended into. Symlinks are reported as files and not followed.
+    """
+    files = []
+    subdirectories = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not any(fnmatch.fnmatch(entry.name, pattern) for pattern in exclude):
+                            subdirectories.append(entry.path)
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    files.append((entry.path, entry.name, stat.st_size, stat.st_mtime))
+                except OSError:
+                    continue
+    except OSError as err:
+        return files, subdirectories, str(err)
+    return files, subdirectories, None
+
+
+def walk(root, exclude=('.git',), walkFilter=None, workers=8, totals=None):
+    """Yield ('dir', path, None, mtime) and ('file', path, size, mtime) records for a tree, plus
+    ('error', path, None, message) for directories that could not be read.
+
+    Directories are scanned concurrently on a thread pool, so records arrive in no particular order.
+    Pass a dict as totals to receive directory/file/byte/error counts once the generator finishes.
+    """
+    walkFilter = walkFilter or WalkFilter()
+    counts = totals if totals is not None else {}
+    counts.update({'directories': 0, 'files': 0, 'matched': 0, 'bytes': 0, 'errors': 0})
+    startTime = time.perf_counter()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = {executor.submit(scanDirectory, root, exclude): root}
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                directory = pending.pop(future)
+                files, subdirectories, error = future.result()
+                if error:
+                    counts['errors'] += 1
+                    yield ('error', directory, None, error)
+                    continue
+                counts['directories'] += 1
+                try:
+                    mtime = os.stat(directory).st_mtime
+                except OSError:
+                    mtime = None
+                yield ('dir', directory, None, mtime)
+                for subdirectory in subdirectories:
+                    pending[executor.submit(scanDirectory, subdirectory, exclude)] = subdirectory
+                for path, name, size, fileMtime in files:
+                    counts['files'] += 1
+                    if walkFilter.matches(name, size, fileMtime):
+                        counts['matched'] += 1
+                        counts['bytes'] += size
+                        yield ('file', path, size, fileMtime)
+
+    counts['seconds'] = round(time.perf_counter() - startTime, 5)
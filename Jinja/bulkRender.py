@@ -0,0 +1,250 @@
+"""
+Filename: bulkRender.py
+Description: Render a Jinja template for every device in a CSV/JSON inventory across a process pool.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from templateService import service as templateService
+
+# ️ Configure logging
+logging.basicConfig(
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stderr)
+    ],
+    level=logging.INFO,
+)
+
+
+def _iterJsonArray(file, chunkSize=1 << 16):
+    """Yield the elements of a top-level JSON array, decoding one element at a time.
+
+    Only the current element and one read chunk are held in memory, so a .json inventory streams
+    the same way .jsonl does.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    eof = False
+    while True:
+        # Skip whitespace and the separators between elements.
+        while position < len(buffer) and buffer[position] in ' \t\r\n,' + ('' if started else '['):
+            if buffer[position] == '[':
+                started = True
+            position += 1
+        if position < len(buffer) and buffer[position] == ']' and started:
+            return
+        if position < len(buffer) and not started:
+            raise ValueError("A .json inventory must hold a list of devices.")
+        if position < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if eof:
+                    raise
+                item = None
+            if item is not None and (end < len(buffer) or eof):
+                yield item
+                position = end
+                continue
+        if eof:
+            raise ValueError("Unexpected end of .json inventory.")
+        chunk = file.read(chunkSize)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def iterInventory(path):
+    """Yield one dict per device, a row at a time for CSV, JSON lines and .json (which must hold a list)."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'r', newline='') as file:
+        if extension == '.csv':
+            yield from csv.DictReader(file)
+        elif extension in ('.jsonl', '.ndjson'):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        elif extension == '.json':
+            yield from _iterJsonArray(file)
+        else:
+            raise ValueError("Unsupported inventory type <{}>. Use .csv, .json or .jsonl.".format(path))
+
+
+def _safeName(value):
+    return re.sub(r'[^\w.-]', '_', str(value)) or '_'
+
+
+def renderToFile(templateName, directory, outdir, nameField, extension, record):
+    """Worker: stream one device's config to <outdir>/<name><extension> with template.generate()."""
+    name = record.get(nameField, '')
+    path = os.path.join(outdir, _safeName(name) + extension)
+    try:
+        template = templateService.get_template(templateName, directory)
+        written = 0
+        with open(path, 'w') as file:
+            for chunk in template.generate(**record):
+                file.write(chunk)
+                written += len(chunk)
+        return {'name': name, 'path': path, 'chars': written, 'error': ''}
+    except Exception as err:
+        return {'name': name, 'path': path, 'chars': 0, 'error': '{}: {}'.format(type(err).__name__, err)}
+
+
+def _claimFileNames(records, nameField, extension, errors):
+    """Yield only records whose output file name is set and not already taken by an earlier record.
+
+    Names are checked after _safeName(), so 'a/b' and 'a_b' collide too. Rejected records are
+    appended to errors as (index, name, message) instead of silently overwriting another device.
+    """
+    taken = {}
+    for index, record in enumerate(records):
+        # Same name renderToFile() will use.
+        name = record.get(nameField, '')
+        if name is None or not str(name).strip():
+            errors.append((index, name, "empty '{}' field, no file name".format(nameField)))
+            continue
+        key = os.path.normcase(_safeName(name) + extension)
+        if key in taken:
+            errors.append((index, name, "file name {} already used by record {}".format(key, taken[key])))
+            continue
+        taken[key] = index
+        yield record
+
+
+def renderToString(templateName, directory, record):
+    """Worker: render one device for the concatenated stream."""
+    template = templateService.get_template(templateName, directory)
+    return ''.join(template.generate(**record))
+
+
+def _bounded(executor, function, records, window):
+    """Submit work with at most window tasks in flight and yield futures in submission order."""
+    pending = collections.deque()
+    for record in records:
+        pending.append(executor.submit(function, record))
+        if len(pending) >= window:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
+def renderAll(inventory, templateName, directory, outdir=None, stream=None, nameField='hostname',
+              extension='.txt', workers=None):
+    """Render every inventory record either to per-device files (outdir) or one concatenated stream.
+
+    Only workers * 4 devices are in flight at once, so memory stays flat no matter how large the
+    inventory is. In file mode, a record with an empty name or a name another record already uses is
+    counted as failed instead of overwriting that file; detecting that needs the claimed names, so
+    file mode keeps one short string per device (about 100 bytes each) and nothing else.
+    Returns (rendered, failed).
+    """
+    workers = workers or os.cpu_count() or 1
+    window = workers * 4
+    rendered = failed = 0
+    directory = os.path.abspath(directory)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        if outdir is not None:
+            os.makedirs(outdir, exist_ok=True)
+            function = _FileJob(templateName, directory, os.path.abspath(outdir), nameField, extension)
+            rejected = []
+            records = _claimFileNames(iterInventory(inventory), nameField, extension, rejected)
+            for future in _bounded(executor, function, records, window):
+                result = future.result()
+                if result['error']:
+                    failed += 1
+                    logging.error("{} -> {}".format(result['name'], result['error']))
+                else:
+                    rendered += 1
+            for index, name, message in rejected:
+                failed += 1
+                logging.error("Record {} ({!r}) skipped -> {}".format(index, name, message))
+        else:
+            function = _StringJob(templateName, directory)
+            for future in _bounded(executor, function, iterInventory(inventory), window):
+                try:
+                    text = future.result()
+                    # Jinja drops the template's trailing newline; keep devices on separate lines.
+                    stream.write(text if text.endswith('\n') else text + '\n')
+                    rendered += 1
+                except Exception as err:
+                    failed += 1
+                    logging.error("Render failed -> {}: {}".format(type(err).__name__, err))
+    return rendered, failed
+
+
+class _FileJob:
+    """Picklable callable handed to the process pool."""
+
+    def __init__(self, templateName, directory, outdir, nameField, extension):
+        self.args = (templateName, directory, outdir, nameField, extension)
+
+    def __call__(self, record):
+        return renderToFile(*self.args, record)
+
+
+class _StringJob:
+    def __init__(self, templateName, directory):
+        self.args = (templateName, directory)
+
+    def __call__(self, record):
+        return renderToString(*self.args, record)
+
+
+def main():
+    """Main Function."""
+    startTime = time.perf_counter()
+    parser = argparse.ArgumentParser(prog='bulkRender.py',
+                                     add_help=True,
+                                     description='Render a Jinja template for every device in an inventory.',
+                                     epilog='\nEnd of the help text.')
+    parser.add_argument('inventory', type=str, help='Inventory file (.csv, .json or .jsonl). One device per row.')
+    parser.add_argument('template', type=str, help='Template file name inside the template directory.')
+    parser.add_argument('-t', '--template-dir', metavar='<dir>', dest='template_dir', default=os.getcwd(),
+                        help='[Optional] Template directory. Default = current directory')
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('-o', '--outdir', metavar='<dir>', dest='outdir', help='Write one file per device into <dir>.')
+    output.add_argument('-s', '--stream', metavar='<file>', dest='stream', help='Write every device to one file, or - for stdout.')
+    parser.add_argument('-n', '--name-field', metavar='<field>', dest='name_field', default='hostname',
+                        help='[Optional] Inventory field used for per-device file names. Default = hostname')
+    parser.add_argument('-e', '--extension', metavar='<ext>', dest='extension', default='.txt',
+                        help='[Optional] Extension for per-device files. Default = .txt')
+    parser.add_argument('-w', '--workers', metavar='<N>', dest='workers', type=int, default=None,
+                        help='[Optional] Render processes. Default = CPU count')
+    args = parser.parse_args()
+
+    if args.outdir:
+        rendered, failed = renderAll(args.inventory, args.template, args.template_dir, outdir=args.outdir,
+                                     nameField=args.name_field, extension=args.extension, workers=args.workers)
+    elif args.stream == '-':
+        rendered, failed = renderAll(args.inventory, args.template, args.template_dir, stream=sys.stdout,
+                                     workers=args.workers)
+    else:
+        with open(args.stream, 'w') as stream:
+            rendered, failed = renderAll(args.inventory, args.template, args.template_dir, stream=stream,
+                                         workers=args.workers)
+
+    logging.info('Rendered {} devices ({} failed) in {} seconds.'.format(
+        rendered, failed, round(time.perf_counter() - startTime, 5)))
+    logging.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logging.warning("Interrupted by user.")
+        sys.exit(0)
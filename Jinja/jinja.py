@@ -7,11 +7,9 @@ Date: 2025-11-03
 
 import sys, time
 import logging
-import subprocess
-from subprocess import check_output
 import os
-import jinja2
-import re
+from templateService import service as templateService
+from resolver import HostResolver
 
 
 # ️ Configure logging
@@ -24,16 +22,18 @@ logging.basicConfig(
 )
 
 def my_logging(func):
+    """Log how long func took. Arguments are not logged; they can hold credentials."""
     import time
+    import functools
+
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        if not logging.getLogger().isEnabledFor(logging.INFO):
+            return func(*args, **kwargs)
         start_time = time.perf_counter()
-        logging.info("Initializing {}() function.".format(func.__name__))
         result = func(*args, **kwargs)
-        end_time = time.perf_counter()
-        logging.info(
-            f"Finished running {func.__name__}() function with args={args}, kwargs={kwargs} "
-            f"in {end_time - start_time:.5f} seconds."
-        )
+        logging.info("Finished running %s() function in %.5f seconds.", func.__name__,
+                     time.perf_counter() - start_time)
         return result
     return wrapper
 
@@ -43,27 +43,22 @@ def main():
     """Main Function."""
 
     logging.info('Running Jinja2 Enviroment from File System Loader on Directory --> {}'.format(os.getcwd()))
-    jinja_env = jinja2.Environment(loader=jinja2.FileSystemLoader(os.getcwd()))
-    logging.info("Jinja2 Environment initialized.")
-    template = jinja_env.get_template('j-template.txt')
-
-    pattern = re.compile(r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})')
-
-    theCalledHost = input('Input Hostname: ').strip()
-
-    returnedOutput = subprocess.check_output(f'nslookup {theCalledHost}').decode('utf-8')
 
-    ipAddrList = pattern.findall(returnedOutput)
-    logging.info("host list: {}".format(ipAddrList))
-    result = template.render(ipList=ipAddrList, hostname=theCalledHost)
-    logging.info(f'\n{result}\n')
+    theCalledHosts = [host.strip() for host in input('Input Hostname(s), comma separated: ').split(',') if host.strip()]
 
+    with HostResolver() as resolver:
+        resolved = resolver.resolve_many(theCalledHosts)
 
-    # for ipAddr in ipAddrList:
-    #     result = template.render(ip_address=ipAddr, hostname=theCalledHost)
-    #     logging.info(f'\n{result}\n')
+    for entry in resolved:
+        if entry['error']:
+            logging.error("Could not resolve {}: {}".format(entry['hostname'], entry['error']))
+            continue
+        ipAddrList = entry['ipv4'] + entry['ipv6']
+        logging.info("host list: {}".format(ipAddrList))
+        result = templateService.render('j-template.txt', os.getcwd(), ipList=ipAddrList, hostname=entry['hostname'])
+        logging.info(f'\n{result}\n')
 
-    theDict = {'ip_address': '10.1.1.1', 'hostname': 'google.com', 'port': '22'}
+    logging.info("Template stats: {}".format(templateService.get_stats()))
 
     time.sleep(0.1)
 
@@ -0,0 +1,120 @@
+"""
+Filename: resolver.py
+Description: Concurrent, in-process DNS resolution with a TTL cache for feeding Jinja templates.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import asyncio
+import concurrent.futures
+import ipaddress
+import socket
+import threading
+import time
+
+
+def parseHostsFile(path):
+    """Read an /etc/hosts style file into {hostname: [addresses]}."""
+    table = {}
+    with open(path, 'r') as file:
+        for line in file:
+            fields = line.split('#', 1)[0].split()
+            if len(fields) < 2:
+                continue
+            address = fields[0]
+            for name in fields[1:]:
+                table.setdefault(name.lower(), []).append(address)
+    return table
+
+
+def _getaddrinfo(hostname):
+    infos = socket.getaddrinfo(hostname, None, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+class HostResolver:
+    """Resolve many hostnames at once without spawning nslookup.
+
+    Lookups go through getaddrinfo on a bounded thread pool (the OS resolver is blocking), results
+    are split into clean A/AAAA lists and cached for ttl seconds. Failures are cached for
+    negative_ttl seconds. For tests, pass hosts_file= (an /etc/hosts style file consulted first)
+    and/or lookup= (a callable hostname -> list of address strings replacing getaddrinfo).
+    """
+
+    def __init__(self, max_workers=32, ttl=300, negative_ttl=30, hosts_file=None, lookup=None):
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hosts = parseHostsFile(hosts_file) if hosts_file else {}
+        self.lookup = lookup or _getaddrinfo
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def _split(hostname, addresses):
+        result = {'hostname': hostname, 'ipv4': [], 'ipv6': [], 'error': ''}
+        seen = set()
+        for address in addresses:
+            # Drop IPv6 zone ids such as fe80::1%eth0 before parsing.
+            address = address.split('%', 1)[0]
+            if address in seen:
+                continue
+            seen.add(address)
+            try:
+                version = ipaddress.ip_address(address).version
+            except ValueError:
+                continue
+            result['ipv4' if version == 4 else 'ipv6'].append(address)
+        return result
+
+    def _cached(self, hostname):
+        with self._lock:
+            entry = self._cache.get(hostname)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def resolve(self, hostname):
+        """Blocking lookup of one hostname, using the cache."""
+        hostname = hostname.strip()
+        key = hostname.lower()
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        if key in self.hosts:
+            result = self._split(hostname, self.hosts[key])
+        else:
+            try:
+                result = self._split(hostname, self.lookup(hostname))
+            except (OSError, UnicodeError) as err:
+                result = {'hostname': hostname, 'ipv4': [], 'ipv6': [], 'error': str(err)}
+
+        ttl = self.negative_ttl if result['error'] else self.ttl
+        with self._lock:
+            self._cache[key] = (time.monotonic() + ttl, result)
+        return result
+
+    async def resolve_async(self, hostnames):
+        """Resolve every hostname concurrently on the resolver's thread pool, in input order."""
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(loop.run_in_executor(self._executor, self.resolve, name)
+                                      for name in hostnames))
+
+    def resolve_many(self, hostnames):
+        """Synchronous version of resolve_async for scripts without an event loop."""
+        return list(self._executor.map(self.resolve, hostnames))
@@ -0,0 +1,102 @@
+"""
+Filename: templateService.py
+Description: Shared Jinja2 environments with template and bytecode caching across calls and runs.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import logging
+import os
+import threading
+import time
+import jinja2
+
+
+class CountingBytecodeCache(jinja2.FileSystemBytecodeCache):
+    """FileSystemBytecodeCache that counts how often compiled bytecode was found on disk."""
+
+    def __init__(self, directory=None, pattern='__jinja2_%s.cache'):
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        super().__init__(directory, pattern)
+        self.hits = 0
+        self.misses = 0
+
+    def load_bytecode(self, bucket):
+        super().load_bytecode(bucket)
+        if bucket.code is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+
+class TemplateService:
+    """One jinja2.Environment per template directory, reused for every render.
+
+    Templates stay compiled in the environment cache and are only re-checked against the file's
+    mtime (auto_reload), and compiled bytecode is kept on disk so a new process skips the parse and
+    compile step as well.
+    """
+
+    def __init__(self, bytecode_dir=None, cache_size=400):
+        self.bytecode_cache = CountingBytecodeCache(bytecode_dir)
+        self.cache_size = cache_size
+        self._environments = {}
+        self._templates = {}
+        self._lock = threading.Lock()
+        self.stats = {'renders': 0,
+                      'template_hits': 0,
+                      'template_loads': 0,
+                      'load_seconds': 0.0,
+                      'render_seconds': 0.0}
+
+    def environment(self, directory=None):
+        directory = os.path.abspath(directory or os.getcwd())
+        with self._lock:
+            env = self._environments.get(directory)
+            if env is None:
+                env = jinja2.Environment(loader=jinja2.FileSystemLoader(directory),
+                                         bytecode_cache=self.bytecode_cache,
+                                         auto_reload=True,
+                                         cache_size=self.cache_size)
+                self._environments[directory] = env
+                logging.info("Jinja2 Environment initialized for {}.".format(directory))
+        return env
+
+    def get_template(self, name, directory=None):
+        env = self.environment(directory)
+        startTime = time.perf_counter()
+        template = env.get_template(name)
+        elapsed = time.perf_counter() - startTime
+
+        key = (id(env), name)
+        with self._lock:
+            if self._templates.get(key) is template:
+                self.stats['template_hits'] += 1
+            else:
+                # First use, or the file changed and Jinja reloaded it.
+                self._templates[key] = template
+                self.stats['template_loads'] += 1
+                self.stats['load_seconds'] += elapsed
+        return template
+
+    def render(self, name, directory=None, **context):
+        template = self.get_template(name, directory)
+        startTime = time.perf_counter()
+        result = template.render(**context)
+        with self._lock:
+            self.stats['renders'] += 1
+            self.stats['render_seconds'] += time.perf_counter() - startTime
+        return result
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['bytecode_hits'] = self.bytecode_cache.hits
+        stats['bytecode_misses'] = self.bytecode_cache.misses
+        stats['environments'] = len(self._environments)
+        return stats
+
+
+# Shared instance so every caller in a process reuses the same environments.
+service = TemplateService()
+
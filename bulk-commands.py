@@ -10,8 +10,13 @@ import os
 import logging
 import sys, time
 import pwinput
+import concurrent.futures
 import ipaddress
 import netmiko
+from networking import networkingDevice
+from connectionPool import ConnectionPool
+from inventory import Inventory
+from instrumentation import metrics, openConnection, closeConnection
 
 # ️ Configure logging
 logging.basicConfig(
@@ -28,11 +33,16 @@ def callParser():
                                      add_help=True,
                                      description='A Standard Interactive SSH Client and Automated Commands.',
                                      epilog='\nEnd of the help text.')
+    parser.add_argument('--metrics', metavar='<file>', required=False, dest='metrics', type=str, help='[Optional] Record per-phase session timings and write them to <file> (.json, or .prom for Prometheus text).', default=None)
     subParser = parser.add_subparsers(title='subcommands', dest='command', required=True)
-    hosts_parser = subParser.add_parser('hostfile',help='Run commands against a list of hosts in a .txt file.')
-    hosts_parser.add_argument('hostfile', type=str, help='A .txt file with a list of hosts IP addresses.')
+    hosts_parser = subParser.add_parser('hostfile',help='Run commands against a list of hosts in a .txt file or inventory.')
+    hosts_parser.add_argument('hostfile', type=str, help='A .txt file with a list of hosts IP addresses, or a .csv/.json/.jsonl/.yaml inventory.')
     hosts_parser.add_argument('commandsfile', type=str, help='A .txt file with a list of commands to run. One command per line.')
     hosts_parser.add_argument('-p','--port', metavar='<port>', required=False, dest='port', type=str, help='[Optional] Port to initiate connection to. Default = 22', default='22')
+    hosts_parser.add_argument('-f','--filter', metavar='<expr>', required=False, dest='filter', type=str, help='[Optional] Inventory filter, e.g. "group=core and site=nyc".', default=None)
+    hosts_parser.add_argument('-g','--groups', metavar='<file>', required=False, dest='groups', type=str, help='[Optional] JSON/YAML file with per-group device_type/port overrides.', default=None)
+    hosts_parser.add_argument('-w','--workers', metavar='<N>', required=False, dest='workers', type=int, help='[Optional] Number of hosts to run concurrently. Default = 1', default=1)
+    hosts_parser.add_argument('-P','--pool-size', metavar='<N>', required=False, dest='pool_size', type=int, help='[Optional] Idle SSH sessions kept for hosts listed more than once. Default = 50', default=50)
 
     ssh_parser = subParser.add_parser('ssh',help='Enter the IP address of a remote host to connect to and run commands against.')
     ssh_parser.add_argument('ip', type=str, help='IPv4 Address to connect to in the notation of X.X.X.X. Defaults = 127.0.0.1', default='127.0.0.1')
@@ -43,30 +53,40 @@ def callParser():
     return arguments
 
 
-def connectSession(ip, username, password, port, commandsfile):
+def connectSession(ip, username, password, port, commandsfile, pool=None, device_type='cisco_ios'):
+    startTime = time.perf_counter()
+    result = {'host': ip, 'status': 'failed', 'elapsed': 0.0, 'error': ''}
     try:
         theIP = format(ipaddress.ip_address(ip))
         logging.info("Connecting to {} over {} ".format(theIP, port))
 
-        deviceInfo = {'host': theIP,
-                      'port': port,
-                      'device_type': 'cisco_ios',
-                      'username': username,
-                      'password': password}
+        deviceInfo = networkingDevice(hostname=theIP, username=username, password=password,
+                                      device_type=device_type, port=port)
 
         file_extension = os.path.splitext(commandsfile)
         if file_extension[1] == ".txt":
-            ssh_connection = netmiko.ConnectHandler(**deviceInfo)
-            ssh_connection.send_config_from_file(commandsfile)
-            ssh_connection.disconnect()
+            with metrics.session(theIP):
+                if pool is not None:
+                    with pool.session(deviceInfo) as ssh_connection:
+                        with metrics.timer('command'):
+                            ssh_connection.send_config_from_file(commandsfile)
+                else:
+                    ssh_connection = openConnection(deviceInfo.get_connection_info(include_password=True))
+                    with metrics.timer('command'):
+                        ssh_connection.send_config_from_file(commandsfile)
+                    closeConnection(ssh_connection)
+            result['status'] = 'success'
         else:
             logging.error("The file <{}> is not a .txt file. Abort Connection.".format(commandsfile))
+            result['error'] = 'Commands file is not a .txt file.'
     except ValueError as val:
         logging.error('{}'.format(val))
         logging.error("Skipping {}".format(str(val).split(' ')[0]))
+        result['error'] = str(val)
     except TimeoutError:
         logging.error("There was an error: {}".format("TimeoutError"))
         logging.error("Skipping {}".format(ip))
+        result['error'] = 'TimeoutError'
     except KeyboardInterrupt:
         logging.exception("User interrupt.")
         logging.error("There was an error: {}".format("KeyboardInterrupt"))
@@ -74,6 +94,51 @@ def connectSession(ip, username, password, port, commandsfile):
         exit(1)
     except netmiko.exceptions.NetMikoTimeoutException as theError:
         logging.error("There was an error: {}".format(theError))
+        result['error'] = str(theError)
+    except Exception as theError:
+        # Keep one bad host from taking down the rest of a concurrent run.
+        logging.error("There was an error connecting to {}: {}".format(ip, theError))
+        result['error'] = str(theError)
+
+    result['elapsed'] = round(time.perf_counter() - startTime, 5)
+    return result
+
+def runHostfile(hostfile, username, password, port, commandsfile, workers=1, pool=None, hostFilter=None, groups=None):
+    """Run connectSession against every host in the hostfile using a bounded thread pool.
+
+    Plain .txt hostfiles use the --port given on the command line; inventory files supply each
+    host's own port and device_type after group overrides.
+    """
+    inventory = Inventory.from_files(hostfile, groups_file=groups, defaults={'port': port})
+    targets = [(host.hostname, host.port, host.device_type) for host in inventory.filter(hostFilter)]
+    hosts = [target[0] for target in targets]
+
+    workers = max(1, workers)
+    logging.info("Running against {} hosts with {} workers.".format(len(hosts), workers))
+
+    results = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(connectSession, theIp, username, password, hostPort, commandsfile, pool, deviceType)
+                   for theIp, hostPort, deviceType in targets]
+        for future in concurrent.futures.as_completed(futures):
+            results.append(future.result())
+
+    # Keep the summary in hostfile order regardless of completion order.
+    order = {theIp: idx for idx, theIp in enumerate(hosts)}
+    results.sort(key=lambda item: order.get(item['host'], len(order)))
+    return results
+
+def logSummary(results):
+    succeeded = [item for item in results if item['status'] == 'success']
+    failed = [item for item in results if item['status'] != 'success']
+
+    logging.info("Summary:")
+    for item in results:
+        if item['status'] == 'success':
+            logging.info("  {:<40} {:<8} {:>10.5f}s".format(item['host'], item['status'], item['elapsed']))
+        else:
+            logging.info("  {:<40} {:<8} {:>10.5f}s  {}".format(item['host'], item['status'], item['elapsed'], item['error']))
+    logging.info("Succeeded: {} | Failed: {} | Total: {}".format(len(succeeded), len(failed), len(results)))
 
     return None
 
@@ -88,25 +153,37 @@ def main():
     setupComplete = time.perf_counter()
     logging.info('Completed initialization in {} seconds.'.format(round(setupComplete-startTime,5)))
 
+    if arguments.metrics:
+        metrics.enable()
+
     # Get username and password to sign into device.
     arguments.username = input("Username: ")
     arguments.password = pwinput.pwinput(prompt="Password: ", mask='*')
 
     if arguments.command == 'hostfile':
         file_extension = os.path.splitext(arguments.hostfile)
-        if file_extension[1] == ".txt":
-            with open(arguments.hostfile, 'r') as file:
-                for line in file:
-                    theIp = line.strip()
-                    connectSession(theIp, arguments.username, arguments.password, arguments.port, arguments.commandsfile)
+        if file_extension[1].lower() in (".txt", ".csv", ".json", ".jsonl", ".yaml", ".yml"):
+            # A single pass only reuses a session when a host appears more than once in the hostfile, so
+            # the pool is sized on its own (not to --workers) to keep those sessions open until they repeat.
+            with ConnectionPool(max_size=max(arguments.workers, arguments.pool_size)) as pool:
+                results = runHostfile(arguments.hostfile, arguments.username, arguments.password, arguments.port,
+                                      arguments.commandsfile, workers=arguments.workers, pool=pool,
+                                      hostFilter=arguments.filter, groups=arguments.groups)
+            logSummary(results)
         else:
-            logging.error("The file <{}> is not a .txt file. - Exiting program.".format(arguments.hostfile))
+            logging.error("The file <{}> is not a .txt or inventory file. - Exiting program.".format(arguments.hostfile))
             pass
     elif arguments.command == 'ssh':
         connectSession(arguments.ip, arguments.username, arguments.password, arguments.port, arguments.commandsfile)
     else:
         print("\n" + arguments.format_usage())
 
+    if metrics.enabled:
+        logging.info("Session phase timings:")
+        metrics.log()
+        if arguments.metrics:
+            logging.info("Metrics written to {}".format(metrics.write(arguments.metrics)))
+
     logging.info("Program finished. - Exiting program.")
     finalTime = time.perf_counter()
     logging.info('Total running time: {} seconds.'.format(round(finalTime-startTime,5)))
@@ -6,14 +6,17 @@ Date: 2025-11-04
 """
 
 import netmiko
-from netmiko.fortinet import FortinetSSH
 import sys
 import logging
 import ipaddress
 import time
 import pwinput
-from networking import networkingDevice
-import re, jinja2, os
+from inventory import resolveTargets
+import re, os
+# Same module name the Jinja/ scripts use, so a process never loads two copies of the shared service.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Jinja'))
+from templateService import service as templateService
+from fortiosParser import iterLines, iterVips, parseHostname
 
 # ️ Configure logging
 logging.basicConfig(
@@ -24,40 +27,37 @@ logging.basicConfig(
     ]
 )
 
-def generateJinjaTemplates(data):
-    jinja_env = jinja2.Environment(loader=jinja2.FileSystemLoader(os.getcwd()))
-    logging.info("Jinja2 Environment initialized.")
-    template = jinja_env.get_template('template.csv')
-    result = template.render(extip=data['extip'],port=data['port'], hostname=data['hostname'], internal_ip=data['internal_ip'],vip=data['vip'])
-    document = open('output.csv', 'w')
-    document.write(result)
-    document.close()
-    logging.info(f'\n{result}\n')
+def generateJinjaTemplates(data, filename='output.csv'):
+    template = templateService.get_template('template.csv', os.getcwd())
+    # Stream the rendered rows straight to disk rather than building the whole document first.
+    # data['vips'] may be a generator, so VIPs are parsed, rendered and written one at a time.
+    with open(filename, 'w') as document:
+        for chunk in template.generate(hostname=data['hostname'], vips=data['vips']):
+            document.write(chunk)
+    logging.info(f'Wrote rendered template to {filename}')
 
     return None
 
-def obtainData(output):
-    ext_pattern = re.compile(r'extip (\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})')
-    mapped_pattern = re.compile(r'mappedip "(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"')
-    extport_pattern = re.compile(r'extport (\d+)')
-    hostName_pattern = re.compile(r'(\w+-FW\w+)')
-    vipName_pattern = re.compile(r'edit "(\w+)"')
-
-    logging.info(output)
-    getExtIP = ext_pattern.findall(output)
-    getMappedIP = mapped_pattern.findall(output)
-    getExtPort = extport_pattern.findall(output)
-    getHostName = hostName_pattern.findall(output)
-    vipName = vipName_pattern.findall(output)
-    data = {'extip': getExtIP,
-            'hostname': getHostName[0],
-            'port': getExtPort,
-            'internal_ip': getMappedIP,
-            'vip': vipName}
-
-    return data
-
-def connectSession(arguments, commands):
+def streamCommand(connection, command, read_timeout=120):
+    """Yield a command's output in chunks as it arrives, until the device prompt returns."""
+    prompt = connection.find_prompt().strip()
+    connection.write_channel(command + connection.RETURN)
+    deadline = time.monotonic() + read_timeout
+    tail = ''
+    while time.monotonic() < deadline:
+        chunk = connection.read_channel()
+        if not chunk:
+            time.sleep(0.05)
+            continue
+        yield chunk
+        tail = (tail + chunk)[-(len(prompt) + 16):]
+        if tail.rstrip().endswith(prompt):
+            return
+        deadline = time.monotonic() + read_timeout
+    raise netmiko.exceptions.NetMikoTimeoutException("Timed out waiting for output of <{}>.".format(command))
+
+def connectSession(arguments, commands=('get system status', 'show firewall vip')):
+    """commands: the system status command, then the VIP table command."""
     try:
         theIP = format(ipaddress.ip_address(arguments['host']))
         logging.info("Connecting to {} over {} ".format(theIP, arguments['port']))
@@ -68,15 +68,22 @@ def connectSession(arguments, commands):
         # connection.send_config_set(commands)
 
         # Needs to be TYPE <list> for send_multiline
-        output = connection.send_multiline(commands)
+        # output = connection.send_multiline(commands)
 
-        # Filter and obtain needed data for template.
-        data_dict = obtainData(output)
+        try:
+            statusCommand, vipCommand = commands
+            hostname = parseHostname(connection.send_command(statusCommand)) or arguments['host']
 
-        # Generate the output based on the data handed to the Jinja Templates.
-        writeTemplate = generateJinjaTemplates(data_dict)
+            # Parse the VIP table as netmiko reads it, one record per VIP, instead of regex passes over the full output.
+            data_dict = {'hostname': hostname,
+                         'vips': iterVips(iterLines(streamCommand(connection, vipCommand)))}
 
-        connection.disconnect()
+            # Generate the output based on the data handed to the Jinja Templates.
+            # One file per firewall, so an inventory run does not overwrite earlier devices.
+            filename = re.sub(r'[^\w.-]', '_', arguments['host']) + '.csv'
+            writeTemplate = generateJinjaTemplates(data_dict, filename=filename)
+        finally:
+            connection.disconnect()
 
     except ValueError as val:
         logging.error('{}'.format(val))
@@ -93,6 +100,12 @@ def connectSession(arguments, commands):
         exit(1)
     except netmiko.exceptions.NetMikoTimeoutException as theError:
         logging.error("There was an error: {}".format(theError))
+    except netmiko.exceptions.NetMikoAuthenticationException as theError:
+        logging.error("Authentication failed on {}: {}".format(arguments['host'], theError))
+    except Exception as theError:
+        # One bad firewall must not stop the rest of an inventory run.
+        logging.exception("Unexpected error on {}: {}".format(arguments['host'], theError))
+        logging.error("Skipping {}".format(arguments['host']))
 
     return None
 
@@ -103,12 +116,15 @@ def main():
     setupComplete = time.perf_counter()
     logging.info('Completed initialization in {} seconds.'.format(round(setupComplete-startTime,5)))
 
-    commandsToRun = ['show firewall vip', 'get system status']
+    commandsToRun = ['get system status', 'show firewall vip']
 
-    deviceInfo = networkingDevice(hostname=input('Enter hostname: '), username=input('Enter username: '), device_type='fortinet')
-    deviceInfo.set_password(pwinput.pwinput(prompt="Password: ", mask='*'))
+    # A hostname, or @inventory.csv [filter] to run against every matching firewall.
+    target = input('Enter hostname or @inventory [filter]: ')
+    username = input('Enter username: ')
+    password = pwinput.pwinput(prompt="Password: ", mask='*')
 
-    connectSession(deviceInfo, commandsToRun)
+    for deviceInfo in resolveTargets(target, username, password, device_type='fortinet'):
+        connectSession(deviceInfo, commandsToRun)
 
 
     logging.info("Program finished. - Exiting program.")
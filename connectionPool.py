@@ -0,0 +1,192 @@
+"""
+Filename: connectionPool.py
+Description: Persistent netmiko SSH connection pool keyed by networkingDevice connection info.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import contextlib
+import logging
+import threading
+import time
+from instrumentation import openConnection, closeConnection
+
+
+class ConnectionPool:
+    """Keep netmiko sessions alive between runs so repeat commands skip the handshake, login and prompt detection.
+
+    Sessions are keyed on networkingDevice.connection_key, health checked with is_alive()
+    before being handed out, closed after idle_timeout seconds unused and capped at max_size
+    open sessions in total. Safe to share between threads.
+    """
+
+    def __init__(self, max_size=50, idle_timeout=300, acquire_timeout=60, health_check=True):
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check = health_check
+        self._idle = {}      # key -> list of (connection, last_used)
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self.stats = {'created': 0, 'reused': 0, 'evicted': 0, 'failed_health_check': 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close_all()
+
+    def __len__(self):
+        with self._condition:
+            return self._in_use + self._idle_count()
+
+    @staticmethod
+    def _key(device):
+        return device.connection_key
+
+    def _idle_count(self):
+        return sum(len(sessions) for sessions in self._idle.values())
+
+    def _close(self, connection):
+        try:
+            closeConnection(connection)
+        except Exception as err:
+            logging.debug("Error while disconnecting pooled session: {}".format(err))
+
+    def _is_healthy(self, connection):
+        if not self.health_check:
+            return True
+        try:
+            return connection.is_alive()
+        except Exception:
+            return False
+
+    def _evict_expired(self):
+        """Drop idle sessions older than idle_timeout. Caller must hold the lock."""
+        now = time.monotonic()
+        expired = []
+        for key in list(self._idle):
+            keep = []
+            for connection, lastUsed in self._idle[key]:
+                if now - lastUsed > self.idle_timeout:
+                    expired.append(connection)
+                else:
+                    keep.append((connection, lastUsed))
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+        self.stats['evicted'] += len(expired)
+        return expired
+
+    def _evict_oldest(self):
+        """Drop the least recently used idle session to make room. Caller must hold the lock."""
+        oldestKey, oldestIdx, oldestTime = None, None, None
+        for key, sessions in self._idle.items():
+            for idx, (connection, lastUsed) in enumerate(sessions):
+                if oldestTime is None or lastUsed < oldestTime:
+                    oldestKey, oldestIdx, oldestTime = key, idx, lastUsed
+        if oldestKey is None:
+            return None
+        connection, lastUsed = self._idle[oldestKey].pop(oldestIdx)
+        if not self._idle[oldestKey]:
+            del self._idle[oldestKey]
+        self.stats['evicted'] += 1
+        return connection
+
+    def acquire(self, device, conn_timeout=None):
+        """Return a live session for the device, reusing an idle one when possible.
+
+        conn_timeout is handed to netmiko when a new session has to be opened.
+        """
+        key = self._key(device)
+        toClose = []
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._condition:
+            toClose.extend(self._evict_expired())
+            while True:
+                sessions = self._idle.get(key)
+                if sessions:
+                    connection, lastUsed = sessions.pop()
+                    if not sessions:
+                        del self._idle[key]
+                    self._in_use += 1
+                    break
+                if self._in_use + self._idle_count() < self.max_size:
+                    connection = None
+                    self._in_use += 1
+                    break
+                oldest = self._evict_oldest()
+                if oldest is not None:
+                    toClose.append(oldest)
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise TimeoutError("No pooled connection available for {} within {} seconds."
+                                       .format(device['host'], self.acquire_timeout))
+
+        for stale in toClose:
+            self._close(stale)
+
+        if connection is not None:
+            if self._is_healthy(connection):
+                with self._condition:
+                    self.stats['reused'] += 1
+                logging.debug("Reusing pooled session to {}".format(device['host']))
+                return connection
+            with self._condition:
+                self.stats['failed_health_check'] += 1
+            logging.info("Pooled session to {} failed health check. Reconnecting.".format(device['host']))
+            self._close(connection)
+
+        info = device.get_connection_info(include_password=True)
+        if conn_timeout is not None:
+            info['conn_timeout'] = conn_timeout
+        try:
+            connection = openConnection(info)
+        except BaseException:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self.stats['created'] += 1
+        return connection
+
+    def release(self, device, connection, discard=False):
+        """Return a session to the pool. Use discard=True when the session is in an unknown state."""
+        with self._condition:
+            self._in_use -= 1
+            if not discard:
+                self._idle.setdefault(self._key(device), []).append((connection, time.monotonic()))
+            self._condition.notify()
+        if discard:
+            self._close(connection)
+
+    @contextlib.contextmanager
+    def session(self, device, conn_timeout=None):
+        """with pool.session(device) as connection: ... - discards the session if the block raises."""
+        connection = self.acquire(device, conn_timeout=conn_timeout)
+        try:
+            yield connection
+        except BaseException:
+            self.release(device, connection, discard=True)
+            raise
+        self.release(device, connection)
+
+    def evict_idle(self):
+        """Close every idle session that has passed idle_timeout."""
+        with self._condition:
+            expired = self._evict_expired()
+        for connection in expired:
+            self._close(connection)
+        return len(expired)
+
+    def close_all(self):
+        """Close every idle session. Sessions currently checked out are closed when released with discard=True."""
+        with self._condition:
+            idle = [connection for sessions in self._idle.values() for connection, lastUsed in sessions]
+            self._idle.clear()
+        for connection in idle:
+            self._close(connection)
+        logging.info("Connection pool closed. Stats -> {}".format(self.stats))
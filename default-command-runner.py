@@ -11,7 +11,11 @@ import logging
 import ipaddress
 import time
 import pwinput
-from networking import networkingDevice
+from connectionPool import ConnectionPool
+from outputStore import OutputStore, recordOutput
+from outputParser import StructuredParser, JsonLinesWriter
+from inventory import resolveTargets
+from instrumentation import metrics, openConnection, closeConnection
 
 # ️ Configure logging
 logging.basicConfig(
@@ -22,13 +26,42 @@ logging.basicConfig(
     ]
 )
 
-def connectSession(arguments, commands):
+def logOutput(host, cmd, output, store=None):
+    """Log command output. With a store, unchanged output is logged as one line and changes as a diff."""
+    if store is None:
+        logging.info(output)
+        return
+    result, message = recordOutput(store, host, cmd, output)
+    if result['previous'] is None:
+        logging.info(output)
+    logging.info(message)
+
+def writeRecords(arguments, cmd, output, structured):
+    """Structured mode: parse the output and emit one JSON line per record."""
+    parser, writer = structured
+    writer.write(parser.records(arguments['host'], arguments['device_type'], cmd, output))
+
+def sendCommands(connection, arguments, commands, store=None, structured=None):
+    """Run each command on an open session and log (and optionally parse) its output."""
+    for cmd in commands:
+        with metrics.timer('command'):
+            output = connection.send_command(cmd)
+        logOutput(arguments['host'], cmd, output, store)
+        if structured is not None:
+            writeRecords(arguments, cmd, output, structured)
+
+def connectSession(arguments, commands, pool=None, store=None, structured=None):
     try:
         theIP = format(ipaddress.ip_address(arguments['host']))
         logging.info("Connecting to {} over {} ".format(theIP, arguments['port']))
 
         # connection = netmiko.ConnectHandler(**arguments)
-        connection = netmiko.ConnectHandler(**arguments.get_connection_info(include_password=True))
+        if pool is not None:
+            with pool.session(arguments) as connection:
+                sendCommands(connection, arguments, commands, store, structured)
+            return None
+
+        connection = openConnection(arguments.get_connection_info(include_password=True))
 
         # Needs to be TYPE <list> for send_multiline
         # connection.send_multiline(commands)
@@ -36,11 +69,10 @@ def connectSession(arguments, commands):
         # Needs to be TYPE <list> and configuration commands
         # connection.send_config_set(commands)
 
-        for cmd in commands:
-            output = connection.send_command(cmd)
-            logging.info(output)
-
-        connection.disconnect()
+        try:
+            sendCommands(connection, arguments, commands, store, structured)
+        finally:
+            closeConnection(connection)
 
     except (ValueError, TimeoutError, netmiko.exceptions.NetMikoTimeoutException) as err:
         logging.error(f"Connection error: {err}")
@@ -49,6 +81,12 @@ def connectSession(arguments, commands):
         sys.exit(1)
     except netmiko.exceptions.NetMikoTimeoutException as theError:
         logging.error("There was an error: {}".format(theError))
+    except netmiko.exceptions.NetMikoAuthenticationException as theError:
+        logging.error("Authentication failed on {}: {}".format(arguments['host'], theError))
+    except Exception as theError:
+        # One bad device must not stop the rest of an inventory run.
+        logging.exception("Unexpected error on {}: {}".format(arguments['host'], theError))
+        logging.error("Skipping {}".format(arguments['host']))
 
     return None
 
@@ -68,11 +106,34 @@ def main():
 
     commandsToRun = ['show ip int br']
 
-    deviceInfo = networkingDevice(hostname=input('Enter hostname: '), username=input('Enter username: '))
-    deviceInfo.set_password(pwinput.pwinput(prompt="Password: ", mask='*'))
-
-    connectSession(deviceInfo, commandsToRun)
-
+    # A hostname, or @inventory.csv [filter] to run against every matching device.
+    target = input('Enter hostname or @inventory [filter]: ')
+    username = input('Enter username: ')
+    devices = list(resolveTargets(target, username, pwinput.pwinput(prompt="Password: ", mask='*')))
+    logging.info("{} device(s) selected.".format(len(devices)))
+    structured = None
+    if input('Structured output as JSON lines (records.jsonl)? (y/N): ').strip().lower() == 'y':
+        structured = (StructuredParser(workers=2), JsonLinesWriter(open('records.jsonl', 'a')))
+
+    # Keep the session open between runs so repeat commands skip the SSH handshake and login.
+    # Outputs are kept in outputs.db; reruns report only what changed. See outputStore.py for history/diff.
+    try:
+        with ConnectionPool(max_size=min(max(len(devices), 1), 50)) as pool, OutputStore('outputs.db') as store:
+            runAgain = True
+            while runAgain:
+                for deviceInfo in devices:
+                    # Per-phase timings are recorded when NETOPS_METRICS=1 is set.
+                    with metrics.session(deviceInfo['host']):
+                        connectSession(deviceInfo, commandsToRun, pool=pool, store=store, structured=structured)
+                runAgain = input('Run commands again? (y/N): ').strip().lower() == 'y'
+    finally:
+        if structured is not None:
+            structured[0].close()
+            structured[1].stream.close()
+
+    if metrics.enabled:
+        logging.info("Session phase timings:")
+        metrics.log()
 
     logging.info("Program finished. - Exiting program.")
     finalTime = time.perf_counter()
@@ -4,8 +4,8 @@ Description: Run Commands on FortiOS / FortiGates through the REST API.
 Author: Hunter R.
 Date: 2025-11-12
 """
-import logging, time, sys, csv, json
-import requests
+import logging, time, sys, csv
+from APIFortinet import FortiGateAPI
 
 # ️ Configure logging
 logging.basicConfig(
@@ -16,11 +16,12 @@ logging.basicConfig(
     ]
 )
 
-def writeData(data):
+def writeData(data, filename='results.csv'):
     fieldHeaders = ['name', 'subnet', 'type', 'interface']
     fieldHeaderUsed = ['Address Name', 'Address Subnet', 'Type of Addr', 'Interface']
 
-    with open('results.csv', 'w', newline='') as csvfile:
+    # data may be any iterable, e.g. FortiGateAPI.iter_table(), and is written row by row.
+    with open(filename, 'w', newline='') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldHeaders, extrasaction='ignore')
         csvfile.write(','.join(fieldHeaderUsed))
         csvfile.write('\n')
@@ -28,33 +29,19 @@ def writeData(data):
 
     return None
 
-def printData(data):
-    parsed_data = json.loads(data.text)
-    output_data = json.dumps(parsed_data, indent=4)
-    logging.info(output_data)
-
-    return None
-
-
 def main():
     startTime = time.perf_counter()
     logging.info("Starting main program...")
     setupComplete = time.perf_counter()
     logging.info('Completed initialization in {} seconds.'.format(round(setupComplete-startTime,5)))
 
-    url = "https://10.48.101.250:8443/api/v2/cmdb/firewall/address/"
-
-    payload = {}
     headers = {
         'Authorization': 'Bearer <API-KEY>'
     }
 
-    theResponse = requests.get(url, headers=headers, params=payload, verify=False)
-
-    to_dict = theResponse.json()
-
-    # writeData(to_dict['results'])
-    printData(theResponse)
+    # Page through the address table and stream each record straight into the CSV.
+    with FortiGateAPI('10.48.101.250:8443', headers=headers) as fortigate:
+        writeData(fortigate.iter_table('cmdb/firewall/address/', page_size=1000))
 
 
     logging.info("Program finished. - Exiting program.")
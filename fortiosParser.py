@@ -0,0 +1,131 @@
+"""
+Filename: fortiosParser.py
+Description: Single-pass, streaming parser for FortiOS config/edit/set/next/end output.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import re
+
+# One token: a double-quoted string (with \" escapes) or a bare word.
+_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|(\S+)')
+_HOSTNAME = re.compile(r'^Hostname:\s*(\S+)', re.MULTILINE)
+
+
+def _tokens(text):
+    return [bare if bare else quoted.replace('\\"', '"') for quoted, bare in _TOKEN.findall(text)]
+
+
+def iterLines(chunks):
+    """Turn arbitrary text chunks (e.g. successive netmiko read_channel() reads) into complete lines."""
+    remainder = ''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        remainder += chunk
+        lines = remainder.split('\n')
+        remainder = lines.pop()
+        for line in lines:
+            yield line.rstrip('\r')
+    if remainder:
+        yield remainder.rstrip('\r')
+
+
+def iterEntries(lines, section=None):
+    """Yield one dict per top-level `edit` entry, in a single pass over the lines.
+
+    section limits output to one table, e.g. 'firewall vip'; None yields entries from every table
+    with the table name under '_section'. Settings become strings (or lists when a `set` has several
+    values), nested `config` blocks become lists of dicts under their name. Only the entry being
+    built is held in memory.
+    """
+    table = None       # current top-level `config <table>`
+    skipDepth = 0      # nested config depth inside a table we are not collecting
+    stack = []         # open nested blocks below the entry: ('config', list) or ('entry', dict)
+    entry = None
+
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        keyword, _, rest = line.partition(' ')
+
+        if table is None:
+            if keyword == 'config':
+                table = rest.strip()
+            continue
+
+        if (section is not None and table != section) or (entry is None and keyword == 'config') or skipDepth:
+            if keyword == 'config':
+                skipDepth += 1
+            elif keyword == 'end':
+                if skipDepth:
+                    skipDepth -= 1
+                else:
+                    table = None
+            continue
+
+        if keyword == 'config':
+            children = []
+            target = stack[-1][1] if stack and stack[-1][0] == 'entry' else entry
+            target[rest.strip()] = children
+            stack.append(('config', children))
+        elif keyword == 'edit':
+            name = _tokens(rest)
+            name = name[0] if name else ''
+            if stack and stack[-1][0] == 'config':
+                child = {'name': name}
+                stack[-1][1].append(child)
+                stack.append(('entry', child))
+            else:
+                entry = {'name': name}
+                if section is None:
+                    entry['_section'] = table
+        elif keyword in ('set', 'unset', 'append'):
+            target = stack[-1][1] if stack and stack[-1][0] == 'entry' else entry
+            tokens = _tokens(rest)
+            if target is None or not tokens:
+                continue
+            values = tokens[1:]
+            if keyword == 'unset':
+                target.pop(tokens[0], None)
+            elif keyword == 'append' and tokens[0] in target:
+                current = target[tokens[0]]
+                target[tokens[0]] = (current if isinstance(current, list) else [current]) + values
+            else:
+                target[tokens[0]] = values[0] if len(values) == 1 else values
+        elif keyword == 'next':
+            if stack and stack[-1][0] == 'entry':
+                stack.pop()
+            elif entry is not None:
+                yield entry
+                entry = None
+        elif keyword == 'end':
+            if stack:
+                stack.pop()
+            else:
+                if entry is not None:
+                    yield entry
+                    entry = None
+                table = None
+
+
+def iterVips(lines):
+    """Yield one record per `config firewall vip` entry with the fields the VIP report uses."""
+    for entry in iterEntries(lines, section='firewall vip'):
+        mapped = entry.get('mappedip', '')
+        if isinstance(mapped, list):
+            mapped = ' '.join(mapped)
+        yield {'vip': entry['name'],
+               'extip': entry.get('extip', ''),
+               'internal_ip': mapped,
+               'port': entry.get('extport', ''),
+               'mappedport': entry.get('mappedport', ''),
+               'extintf': entry.get('extintf', ''),
+               'portforward': entry.get('portforward', '')}
+
+
+def parseHostname(output):
+    """Hostname from `get system status` output, or None."""
+    match = _HOSTNAME.search(output)
+    return match.group(1) if match else None
@@ -0,0 +1,316 @@
+"""
+Filename: instrumentation.py
+Description: Per-phase timing of device sessions with histogram/percentile export as JSON or Prometheus text.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import bisect
+import functools
+import heapq
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+# Session phases in the order they happen; any other name (e.g. 'function:main') is also accepted.
+PHASES = ('dns', 'tcp_connect', 'login', 'command', 'disconnect', 'session')
+
+# Geometric bucket bounds, 2**(1/8) apart (about 9%), from 1 microsecond to about an hour.
+_RATIO = 2 ** 0.125
+BOUNDS = [1e-6 * _RATIO ** i for i in range(255)]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram. Percentiles are accurate to one bucket (~9%)."""
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucketCount in enumerate(self.counts):
+            seen += bucketCount
+            if bucketCount and seen >= rank:
+                upper = BOUNDS[index] if index < len(BOUNDS) else self.max
+                lower = BOUNDS[index - 1] if index else 0.0
+                # Geometric midpoint of the bucket, kept inside the observed range.
+                estimate = (lower * upper) ** 0.5 if lower else upper
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        return {'count': self.count,
+                'sum': round(self.total, 6),
+                'mean': round(self.total / self.count, 6),
+                'min': round(self.min, 6),
+                'p50': round(self.percentile(0.50), 6),
+                'p90': round(self.percentile(0.90), 6),
+                'p99': round(self.percentile(0.99), 6),
+                'max': round(self.max, 6)}
+
+
+class _NullTimer:
+    """Shared do-nothing context manager handed out while metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def phase(self, name):
+        return self
+
+
+_NULL = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'session', 'start')
+
+    def __init__(self, metrics, name, session):
+        self.metrics = metrics
+        self.name = name
+        self.session = session
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        elapsed = time.perf_counter() - self.start
+        self.metrics.observe(self.name, elapsed)
+        if self.session is not None:
+            self.session.phases[self.name] = self.session.phases.get(self.name, 0.0) + elapsed
+        return False
+
+
+class SessionTimer:
+    """One device session. Phases timed on this thread while it is open are attributed to it."""
+
+    def __init__(self, metrics, host):
+        self.metrics = metrics
+        self.host = host
+        self.phases = {}
+        self.failed = False
+
+    def phase(self, name):
+        return _Timer(self.metrics, name, self)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self._previous = getattr(self.metrics._local, 'session', None)
+        self.metrics._local.session = self
+        return self
+
+    def __exit__(self, excType, *args):
+        self.metrics._local.session = self._previous
+        self.failed = excType is not None
+        elapsed = time.perf_counter() - self.start
+        self.phases['session'] = elapsed
+        self.metrics.observe('session', elapsed)
+        self.metrics._finish(self, elapsed)
+        return False
+
+
+class Metrics:
+    """Registry of phase histograms plus the slowest sessions with their phase breakdown.
+
+    While disabled, timer() and session() return a shared no-op object, so instrumented code costs
+    one attribute check per call. Only hostnames and phase names are recorded; never arguments,
+    connection info or credentials.
+    """
+
+    def __init__(self, enabled=False, keep_slowest=20):
+        self.enabled = enabled
+        self.keep_slowest = keep_slowest
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self._slowest = []
+            self._sessions = 0
+            self._failed = 0
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def timer(self, name):
+        """Context manager timing one phase, attributed to this thread's open session if any."""
+        if not self.enabled:
+            return _NULL
+        return _Timer(self, name, getattr(self._local, 'session', None))
+
+    def session(self, host):
+        if not self.enabled:
+            return _NULL
+        return SessionTimer(self, str(host))
+
+    def _finish(self, session, elapsed):
+        record = (elapsed, session.host, dict(session.phases), session.failed)
+        with self._lock:
+            self._sessions += 1
+            self._failed += session.failed
+            if len(self._slowest) < self.keep_slowest:
+                heapq.heappush(self._slowest, record)
+            elif elapsed > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, record)
+
+    def snapshot(self):
+        with self._lock:
+            order = {name: index for index, name in enumerate(PHASES)}
+            names = sorted(self.histograms, key=lambda name: (order.get(name, len(order)), name))
+            return {'sessions': self._sessions,
+                    'failed_sessions': self._failed,
+                    'phases': {name: self.histograms[name].summary() for name in names},
+                    'slowest': [{'host': host, 'seconds': round(elapsed, 6), 'failed': failed,
+                                 'phases': {name: round(value, 6) for name, value in phases.items()}}
+                                for elapsed, host, phases, failed in sorted(self._slowest, reverse=True)]}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix='netops'):
+        """Prometheus text exposition: one summary per phase with 0.5/0.9/0.99 quantiles."""
+        snapshot = self.snapshot()
+        name = prefix + '_phase_seconds'
+        lines = ['# HELP {} Time spent per device session phase.'.format(name),
+                 '# TYPE {} summary'.format(name)]
+        for phase, summary in snapshot['phases'].items():
+            if not summary['count']:
+                continue
+            label = phase.replace('\\', '\\\\').replace('"', '\\"')
+            for quantile in ('0.5', '0.9', '0.99'):
+                key = 'p' + quantile[2:].ljust(2, '0')
+                lines.append('{}{{phase="{}",quantile="{}"}} {}'.format(name, label, quantile, summary[key]))
+            lines.append('{}_sum{{phase="{}"}} {}'.format(name, label, summary['sum']))
+            lines.append('{}_count{{phase="{}"}} {}'.format(name, label, summary['count']))
+        lines.append('# TYPE {}_sessions_total counter'.format(prefix))
+        lines.append('{}_sessions_total {}'.format(prefix, snapshot['sessions']))
+        lines.append('# TYPE {}_failed_sessions_total counter'.format(prefix))
+        lines.append('{}_failed_sessions_total {}'.format(prefix, snapshot['failed_sessions']))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write to path; .prom/.txt get Prometheus text, anything else JSON."""
+        text = self.to_prometheus() if os.path.splitext(path)[1].lower() in ('.prom', '.txt') else self.to_json()
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def log(self):
+        """Log one line per phase with count and p50/p90/p99/max in milliseconds."""
+        for phase, summary in self.snapshot()['phases'].items():
+            if summary['count']:
+                logging.info("  {:<24} n={:<6} p50={:>9.2f}ms p90={:>9.2f}ms p99={:>9.2f}ms max={:>9.2f}ms".format(
+                    phase, summary['count'], summary['p50'] * 1e3, summary['p90'] * 1e3,
+                    summary['p99'] * 1e3, summary['max'] * 1e3))
+
+
+# Process-wide registry. Set NETOPS_METRICS=1 (or call metrics.enable()) to turn it on.
+metrics = Metrics(enabled=os.environ.get('NETOPS_METRICS', '') not in ('', '0'))
+
+
+def instrument(name=None):
+    """Decorator recording each call's duration as 'function:<name>' when metrics are enabled."""
+    def decorator(func):
+        label = 'function:' + (name or func.__name__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            with metrics.timer(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _connectSocket(host, port, timeout):
+    """Resolve and connect, timing dns and tcp_connect. Tries every resolved address like netmiko does."""
+    with metrics.timer('dns'):
+        addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    error = None
+    with metrics.timer('tcp_connect'):
+        for family, socktype, proto, _, address in addresses:
+            sock = socket.socket(family, socktype, proto)
+            try:
+                sock.settimeout(timeout)
+                sock.connect(address)
+                return sock
+            except OSError as err:
+                sock.close()
+                error = err
+    raise error or OSError("No addresses for {}".format(host))
+
+
+def openConnection(info):
+    """netmiko.ConnectHandler(**info), with dns/tcp_connect/login phases when metrics are enabled.
+
+    With metrics on, the TCP connection is opened here and handed to netmiko through its public
+    sock= argument, so dns and tcp_connect time the socket the session actually uses and the
+    connect happens only once. 'login' is ConnectHandler itself (SSH auth and prompt detection).
+    Telnet/serial device types, an ssh_config_file (proxy/jump hosts) or a caller supplied sock are
+    left entirely to netmiko and only timed as 'login'.
+    """
+    import netmiko
+    if not metrics.enabled:
+        return netmiko.ConnectHandler(**info)
+
+    deviceType = info.get('device_type', '')
+    if 'telnet' in deviceType or 'serial' in deviceType or info.get('ssh_config_file') or info.get('sock'):
+        with metrics.timer('login'):
+            return netmiko.ConnectHandler(**info)
+
+    try:
+        sock = _connectSocket(info['host'], int(info.get('port') or 22), info.get('conn_timeout', 15))
+    except OSError as err:
+        # Same exception netmiko raises when its own TCP connect fails.
+        raise netmiko.exceptions.NetMikoTimeoutException(
+            "TCP connection to device failed. {}:{} -> {}".format(info['host'], info.get('port') or 22, err)) from err
+    try:
+        with metrics.timer('login'):
+            return netmiko.ConnectHandler(sock=sock, **info)
+    except BaseException:
+        sock.close()
+        raise
+
+
+def closeConnection(connection):
+    with metrics.timer('disconnect'):
+        connection.disconnect()
@@ -0,0 +1,346 @@
+"""
+Filename: inventory.py
+Description: Lazy CSV/YAML/JSON device inventory with groups, per-group overrides and filter expressions.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import argparse
+import csv
+import fnmatch
+import json
+import logging
+import os
+import re
+import sys
+from networking import networkingDevice
+
+# Fields every host has; anything else in a row is kept in InventoryHost.data.
+CORE_FIELDS = ('hostname', 'device_type', 'port', 'username')
+DEFAULTS = {'device_type': 'cisco_ios', 'port': '22', 'username': ''}
+
+
+class InventoryHost:
+    """One inventory row after group overrides. Slotted, so 100k of them stay small."""
+
+    __slots__ = ('hostname', 'groups', 'device_type', 'port', 'username', 'data')
+
+    def __init__(self, hostname, groups=(), device_type='cisco_ios', port='22', username='', data=None):
+        self.hostname = hostname
+        self.groups = tuple(groups)
+        self.device_type = device_type
+        self.port = str(port)
+        self.username = username
+        self.data = data
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(hostname={self.hostname!r}, groups={self.groups!r}, "
+                f"device_type={self.device_type!r}, port={self.port!r})")
+
+    def get(self, field, default=None):
+        if field in self.__slots__ and field != 'data':
+            return getattr(self, field)
+        if self.data:
+            return self.data.get(field, default)
+        return default
+
+    def to_device(self, username=None, password=''):
+        """networkingDevice for this host; username falls back to the inventory value."""
+        return networkingDevice(hostname=self.hostname, username=username or self.username, password=password,
+                                device_type=self.device_type, port=self.port)
+
+
+def _splitGroups(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in re.split(r'[;,|]', str(value)) if item.strip()]
+
+
+def _loadStructured(path):
+    """Whole-file JSON/YAML. Either a list of hosts or {'defaults', 'groups', 'hosts'}."""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'r') as file:
+        if extension in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML inventories need PyYAML (pip install pyyaml).")
+            content = yaml.safe_load(file)
+        else:
+            content = json.load(file)
+    if isinstance(content, list):
+        return {}, {}, content
+    content = content or {}
+    hosts = content.get('hosts', [])
+    if isinstance(hosts, dict):
+        # {hostname: {fields}} form, common in YAML inventories.
+        hosts = [dict(fields or {}, hostname=name) for name, fields in hosts.items()]
+    return content.get('defaults', {}), content.get('groups', {}), hosts
+
+
+def iterRows(path):
+    """Yield raw host dicts. .txt, .csv and .jsonl are read a line at a time."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.txt':
+        with open(path, 'r') as file:
+            for line in file:
+                if line.strip() and not line.lstrip().startswith('#'):
+                    yield {'hostname': line.strip()}
+    elif extension == '.csv':
+        with open(path, 'r', newline='') as file:
+            yield from csv.DictReader(file)
+    elif extension in ('.jsonl', '.ndjson'):
+        with open(path, 'r') as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+    elif extension in ('.json', '.yaml', '.yml'):
+        yield from _loadStructured(path)[2]
+    else:
+        raise ValueError("Unsupported inventory type <{}>. Use .txt, .csv, .json, .jsonl or .yaml.".format(path))
+
+
+class Inventory:
+    """Stream InventoryHost records from a file.
+
+    Settings are layered defaults= argument < the file's 'defaults' section < groups (in the order
+    a host lists them) < the host row itself. Groups come from the 'groups' section of a JSON/YAML
+    inventory and/or the groups= argument (e.g. loaded from a separate groups file). Rows are turned
+    into hosts one at a time, so filtering a large CSV/JSONL inventory never holds it all.
+    """
+
+    def __init__(self, path, groups=None, defaults=None):
+        self.path = path
+        self.groups = {}
+        self._rows = None
+        fileDefaults = {}
+        extension = os.path.splitext(path)[1].lower()
+        if extension in ('.json', '.yaml', '.yml'):
+            # Parsed once; the host list is kept for __iter__ instead of reading the file again.
+            fileDefaults, fileGroups, self._rows = _loadStructured(path)
+            self.groups.update(fileGroups)
+        # defaults= is only a fallback: the file's own defaults section wins over it.
+        self.defaults = {**DEFAULTS, **(defaults or {}), **fileDefaults}
+        self.groups.update(groups or {})
+        self._merged = {}
+
+    @classmethod
+    def from_files(cls, path, groups_file=None, **kwargs):
+        groups = _loadStructured(groups_file)[1] if groups_file else None
+        return cls(path, groups=groups, **kwargs)
+
+    def _settings(self, groups):
+        """Merged defaults + group overrides, cached per distinct group list."""
+        merged = self._merged.get(groups)
+        if merged is None:
+            merged = dict(self.defaults)
+            for group in groups:
+                merged.update(self.groups.get(group) or {})
+            self._merged[groups] = merged
+        return merged
+
+    def _host(self, row):
+        hostname = row.get('hostname') or row.get('host') or row.get('ip')
+        if not hostname:
+            return None
+        groups = tuple(_splitGroups(row.get('groups', row.get('group'))))
+        settings = self._settings(groups)
+        data = {key: value for key, value in row.items()
+                if key not in CORE_FIELDS and key not in ('host', 'ip', 'groups', 'group')
+                and value not in (None, '')}
+        for key, value in settings.items():
+            if key not in CORE_FIELDS:
+                data.setdefault(key, value)
+        return InventoryHost(str(hostname).strip(), groups,
+                             row.get('device_type') or settings.get('device_type', 'cisco_ios'),
+                             row.get('port') or settings.get('port', '22'),
+                             row.get('username') or settings.get('username', ''),
+                             data or None)
+
+    def __iter__(self):
+        rows = self._rows if self._rows is not None else iterRows(self.path)
+        for row in rows:
+            host = self._host(row)
+            if host is not None:
+                yield host
+
+    def filter(self, expression=None):
+        """Hosts matching a filter expression (see compileFilter); all hosts when None."""
+        if not expression:
+            return iter(self)
+        match = compileFilter(expression)
+        return (host for host in self if match(host))
+
+    def devices(self, expression=None, username=None, password=''):
+        """networkingDevice objects for matching hosts, built only as they are consumed."""
+        for host in self.filter(expression):
+            yield host.to_device(username=username, password=password)
+
+
+def resolveTargets(target, username='', password='', device_type='cisco_ios'):
+    """Devices for an interactive hostname prompt.
+
+    A plain hostname gives one device. '@<inventory file> [filter expression]' streams every
+    matching inventory device instead, with device_type as the default for hosts that set none.
+    """
+    target = target.strip()
+    if not target.startswith('@'):
+        return iter([networkingDevice(hostname=target, username=username, password=password,
+                                      device_type=device_type)])
+    path, _, expression = target[1:].strip().partition(' ')
+    inventory = Inventory(path, defaults={'device_type': device_type})
+    return inventory.devices(expression.strip() or None, username=username, password=password)
+
+
+_FILTER_TOKEN = re.compile(r"""\s*(?:
+    (?P<paren>[()])
+  | (?P<compare>(?P<field>[A-Za-z_][\w.-]*)\s*(?P<op>!=|!~|=|~|<=|>=|<|>)\s*
+        (?P<value>"[^"]*"|'[^']*'|[^\s()]+))
+  | (?P<word>[A-Za-z]+)
+)""", re.VERBOSE)
+
+
+def _tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _FILTER_TOKEN.match(expression, position)
+        if match is None or match.end() == position:
+            raise ValueError("Bad filter near <{}>.".format(expression[position:]))
+        position = match.end()
+        if match.group('paren'):
+            tokens.append(match.group('paren'))
+        elif match.group('compare'):
+            value = match.group('value')
+            if value[:1] in ('"', "'"):
+                value = value[1:-1]
+            tokens.append(('cmp', match.group('field'), match.group('op'), value))
+        else:
+            word = match.group('word').lower()
+            if word not in ('and', 'or', 'not'):
+                raise ValueError("Unknown filter word <{}>.".format(match.group('word')))
+            tokens.append(word)
+    return tokens
+
+
+def _comparison(field, op, value):
+    if field in ('group', 'groups'):
+        if op not in ('=', '!='):
+            raise ValueError("group only supports = and !=.")
+        test = lambda host: any(fnmatch.fnmatchcase(group, value) for group in host.groups)
+        return test if op == '=' else (lambda host: not test(host))
+    if op in ('~', '!~'):
+        pattern = re.compile(value)
+        if op == '~':
+            return lambda host: pattern.search(str(host.get(field, ''))) is not None
+        return lambda host: pattern.search(str(host.get(field, ''))) is None
+    if op in ('=', '!='):
+        equal = lambda host: fnmatch.fnmatchcase(str(host.get(field, '')), value)
+        return equal if op == '=' else (lambda host: not equal(host))
+    number = float(value)
+    compare = {'<': float.__lt__, '<=': float.__le__, '>': float.__gt__, '>=': float.__ge__}[op]
+
+    def numeric(host):
+        try:
+            return compare(float(host.get(field)), number)
+        except (TypeError, ValueError):
+            return False
+    return numeric
+
+
+def compileFilter(expression):
+    """Compile a filter expression to a predicate on InventoryHost.
+
+    Terms are field=glob, field!=glob, field~regex, field!~regex and numeric field<n/<=/>/>=.
+    'group=core' matches any of a host's groups. Terms combine with and/or/not and parentheses;
+    terms next to each other without an operator are ANDed. Example:
+        group=core and device_type=cisco_* and not hostname~^lab-
+    """
+    tokens = _tokenize(expression)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parseOr():
+        terms = [parseAnd()]
+        while peek() == 'or':
+            take()
+            terms.append(parseAnd())
+        return terms[0] if len(terms) == 1 else (lambda host: any(term(host) for term in terms))
+
+    def parseAnd():
+        terms = [parseNot()]
+        while peek() not in (None, ')', 'or'):
+            if peek() == 'and':
+                take()
+            terms.append(parseNot())
+        return terms[0] if len(terms) == 1 else (lambda host: all(term(host) for term in terms))
+
+    def parseNot():
+        if peek() == 'not':
+            take()
+            inner = parseNot()
+            return lambda host: not inner(host)
+        token = take() if peek() is not None else None
+        if token == '(':
+            inner = parseOr()
+            if peek() != ')':
+                raise ValueError("Unbalanced parentheses in filter.")
+            take()
+            return inner
+        if isinstance(token, tuple):
+            return _comparison(*token[1:])
+        raise ValueError("Expected a term in filter <{}>.".format(expression))
+
+    predicate = parseOr()
+    if position != len(tokens):
+        raise ValueError("Unexpected <{}> in filter.".format(tokens[position]))
+    return predicate
+
+
+def main():
+    """Main Function."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                        handlers=[logging.StreamHandler(sys.stderr)])
+    parser = argparse.ArgumentParser(prog='inventory.py',
+                                     add_help=True,
+                                     description='List the devices in an inventory that match a filter.',
+                                     epilog='\nEnd of the help text.')
+    parser.add_argument('inventory', type=str, help='Inventory file (.txt, .csv, .json, .jsonl or .yaml).')
+    parser.add_argument('-f', '--filter', metavar='<expr>', dest='filter', default=None,
+                        help='[Optional] Filter expression, e.g. "group=core and device_type=cisco_*".')
+    parser.add_argument('-g', '--groups', metavar='<file>', dest='groups', default=None,
+                        help='[Optional] JSON/YAML file with a groups section of per-group overrides.')
+    parser.add_argument('-c', '--count', action='store_true', dest='count', help='[Optional] Only print the count.')
+    args = parser.parse_args()
+
+    inventory = Inventory.from_files(args.inventory, groups_file=args.groups)
+    count = 0
+    try:
+        for host in inventory.filter(args.filter):
+            count += 1
+            if not args.count:
+                print(json.dumps({'hostname': host.hostname, 'groups': list(host.groups),
+                                  'device_type': host.device_type, 'port': host.port, **(host.data or {})}))
+    except ValueError as err:
+        logging.error("{}".format(err))
+        sys.exit(1)
+    logging.info("{} devices matched.".format(count))
+    logging.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logging.warning("Interrupted by user.")
+        sys.exit(0)
@@ -5,8 +5,14 @@ Author: Hunter R.
 Date: 2025-07-28
 """
 import tkinter as tk
-from tkinter import ttk, scrolledtext, font
-import netmiko, ipaddress, logging, time, sys
+from tkinter import ttk, scrolledtext, font, filedialog, simpledialog, messagebox
+import ipaddress, logging, time, sys
+import queue, threading, concurrent.futures
+import collections, datetime, os, re, json
+from outputStore import OutputStore, recordOutput
+from outputParser import StructuredParser, JsonLinesWriter
+from inventory import Inventory
+from instrumentation import metrics, openConnection, closeConnection
 
 
 # ️ Configure logging
@@ -18,11 +24,140 @@ logging.basicConfig(
     ]
 )
 
+class LogView(ttk.Frame):
+    """Log pane that stays fast with hundreds of hosts of show run output.
+
+    Lines are buffered and inserted once per flush() instead of once per message, the widget and
+    an in-memory ring buffer keep only the last max_lines lines, and the full transcript for each
+    host is spilled to transcript_dir/<host>.log. Transcript lines are also batched and each host's
+    file is opened in append mode once per flush, so hundreds of hosts never hold hundreds of file
+    descriptors. The filter box re-renders one host from the ring buffer without touching the others.
+    """
+
+    ALL_HOSTS = "All hosts"
+
+    def __init__(self, parent, max_lines=5000, transcript_root="transcripts", **kwargs):
+        super().__init__(parent, **kwargs)
+        self.max_lines = max_lines
+        self.transcript_root = transcript_root
+        self.transcript_dir = None
+        self._lines = collections.deque(maxlen=max_lines)   # (host, line)
+        self._pending = []
+        self._spilled = {}   # host key -> transcript lines not yet written
+        self._paths = {}
+        self._widget_lines = 0
+        self._hosts = []
+        self.rowconfigure(1, weight=1)
+        self.columnconfigure(1, weight=1)
+
+        ttk.Label(self, text="Show:").grid(row=0, column=0, sticky="W")
+        self.filter_box = ttk.Combobox(self, state="readonly", values=[self.ALL_HOSTS])
+        self.filter_box.set(self.ALL_HOSTS)
+        self.filter_box.grid(row=0, column=1, sticky="W", pady=(0,5))
+        self.filter_box.bind("<<ComboboxSelected>>", lambda event: self._render())
+
+        self.text = scrolledtext.ScrolledText(self, state="disabled", bg="#1e1e1e", fg="#dcdcdc")
+        self.text.grid(row=1, column=0, columnspan=2, sticky="NSEW")
+
+    def start_transcript(self):
+        """Begin a new per-host transcript directory for a run."""
+        self.close_transcript()
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.transcript_dir = os.path.join(self.transcript_root, stamp)
+        os.makedirs(self.transcript_dir, exist_ok=True)
+        return self.transcript_dir
+
+    def close_transcript(self):
+        self._write_transcripts()
+        self._paths.clear()
+
+    def _spill(self, host, msg):
+        if self.transcript_dir is None:
+            return
+        self._spilled.setdefault(host or "_job", []).append(msg)
+
+    def _write_transcripts(self):
+        """Append every host's batched transcript lines, holding one file open at a time."""
+        spilled, self._spilled = self._spilled, {}
+        for key, messages in spilled.items():
+            path = self._paths.get(key)
+            if path is None:
+                filename = re.sub(r'[^\w.-]', '_', key) + ".log"
+                path = self._paths[key] = os.path.join(self.transcript_dir, filename)
+            with open(path, "a", encoding="utf-8") as handle:
+                handle.write("\n".join(messages) + "\n")
+
+    def write_transcript(self, msg, host=None):
+        """Write to the host's transcript file only, without showing it in the pane."""
+        self._spill(host, msg)
+
+    def append(self, msg, host=None):
+        """Queue a message. Cheap; nothing is drawn until flush()."""
+        self._spill(host, msg)
+        if host and host not in self._hosts:
+            self._hosts.append(host)
+            self.filter_box.config(values=[self.ALL_HOSTS] + self._hosts)
+        for line in msg.split("\n"):
+            self._lines.append((host, line))
+            self._pending.append((host, line))
+
+    def _visible(self, host):
+        selected = self.filter_box.get()
+        return selected == self.ALL_HOSTS or host == selected
+
+    def _write(self, lines, replace=False):
+        self.text.config(state="normal")
+        if replace:
+            self.text.delete("1.0", tk.END)
+            self._widget_lines = 0
+        if lines:
+            self.text.insert(tk.END, "\n".join(lines) + "\n")
+            self._widget_lines += len(lines)
+        excess = self._widget_lines - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self._widget_lines -= excess
+        self.text.see(tk.END)
+        self.text.config(state="disabled")
+
+    def flush(self):
+        """Write batched transcript lines and draw everything queued since the last flush in a single insert."""
+        if self._spilled:
+            self._write_transcripts()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending[-self.max_lines:], []
+        self._write([line for host, line in pending if self._visible(host)])
+
+    def _render(self):
+        self._pending = []
+        self._write([line for host, line in self._lines if self._visible(host)], replace=True)
+
+    def clear(self):
+        self._lines.clear()
+        self._pending = []
+        self._hosts = []
+        self.filter_box.config(values=[self.ALL_HOSTS])
+        self.filter_box.set(self.ALL_HOSTS)
+        self._write([], replace=True)
+
+
 class IOSXEScriptRunner(tk.Tk):
     def __init__(self):
         startTime = time.perf_counter()
         logging.info("Starting IOS-XE Script Runner Program.")
         super().__init__()
+        self.log_queue = queue.Queue()
+        # Every output is kept in outputs.db; hosts whose output did not change log one line.
+        self.store = OutputStore("outputs.db")
+        self.parser = StructuredParser(workers=2)
+        self.records = None
+        self._inventory_hosts = {}
+        self._inventory_text = ""
+        self._cancel = threading.Event()
+        self._running = False
+        self._job_thread = None
+        self._closing = False
         self.title("IOS-XE Script Runner")
         self._center_window(1200, 700)
         self._setup_style()
@@ -64,8 +199,10 @@ class IOSXEScriptRunner(tk.Tk):
         inputs.columnconfigure(1, weight=1)
 
         ttk.Label(inputs, text="Hosts (one per line):").grid(row=0, column=0, sticky="W")
+        ttk.Button(inputs, text="Load Inventory...", command=self._on_load_inventory).grid(row=0, column=1, sticky="E")
         self.host_txt = tk.Text(inputs, height=8, width=30, bg="white")
         self.host_txt.grid(row=1, column=0, columnspan=2, sticky="EW", pady=5)
+        self.host_txt.bind("<<Modified>>", self._on_hosts_modified)
 
         ttk.Label(inputs, text="Commands (one per line):").grid(row=2, column=0, sticky="W", pady=(10,0))
         self.cmd_txt = tk.Text(inputs, height=5, width=30, bg="white")
@@ -79,15 +216,31 @@ class IOSXEScriptRunner(tk.Tk):
         self.pw_entry = ttk.Entry(inputs, show="*")
         self.pw_entry.grid(row=5, column=1, sticky="EW", pady=5)
 
+        ttk.Label(inputs, text="Parallel Hosts:").grid(row=6, column=0, sticky="W", pady=5)
+        self.workers_spin = ttk.Spinbox(inputs, from_=1, to=64, width=5)
+        self.workers_spin.set(8)
+        self.workers_spin.grid(row=6, column=1, sticky="W", pady=5)
+
+        self.structured_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(inputs, text="Structured output (JSON lines)",
+                        variable=self.structured_var).grid(row=7, column=0, columnspan=2, sticky="W", pady=5)
+
         # Buttons Frame
         btns = ttk.Frame(container, padding=(0,10))
         btns.grid(row=1, column=0, sticky="EW")
-        btns.columnconfigure((0,1), weight=1)
+        btns.columnconfigure((0,1,2), weight=1)
 
-        run_btn = ttk.Button(btns, text="Run", command=self._on_run)
-        run_btn.grid(row=0, column=0, sticky="EW", padx=5)
+        self.run_btn = ttk.Button(btns, text="Run", command=self._on_run)
+        self.run_btn.grid(row=0, column=0, sticky="EW", padx=5)
+        self.cancel_btn = ttk.Button(btns, text="Cancel", command=self._on_cancel, state="disabled")
+        self.cancel_btn.grid(row=0, column=1, sticky="EW", padx=5)
         quit_btn = ttk.Button(btns, text="Quit", command=self.destroy)
-        quit_btn.grid(row=0, column=1, sticky="EW", padx=5)
+        quit_btn.grid(row=0, column=2, sticky="EW", padx=5)
+
+        self.progress = ttk.Progressbar(btns, mode="determinate")
+        self.progress.grid(row=1, column=0, columnspan=3, sticky="EW", padx=5, pady=(10,0))
+        self.progress_lbl = ttk.Label(btns, text="Idle")
+        self.progress_lbl.grid(row=2, column=0, columnspan=3, sticky="W", padx=5)
 
         # Log Frame
         log_frame = ttk.Labelframe(container, text="Log", padding=15)
@@ -95,55 +248,205 @@ class IOSXEScriptRunner(tk.Tk):
         log_frame.rowconfigure(0, weight=1)
         log_frame.columnconfigure(0, weight=1)
 
-        self.log_txt = scrolledtext.ScrolledText(
-            log_frame, state="disabled", bg="#1e1e1e", fg="#dcdcdc"
-        )
-        self.log_txt.grid(sticky="NSEW")
+        self.log_view = LogView(log_frame)
+        self.log_view.grid(sticky="NSEW")
         finishedTime = time.perf_counter()
         logging.info(f"Finished Building UI in {finishedTime - startTime:.4f} seconds")
 
     def _on_run(self):
-        startTime = time.perf_counter()
+        if self._running:
+            return
         logging.info("Starting _on_run function to iterate over commands for each host given.")
-        hosts   = self.host_txt.get("1.0", tk.END).strip().splitlines()
+        hosts   = [host.strip() for host in self.host_txt.get("1.0", tk.END).strip().splitlines() if host.strip()]
         cmds    = self.cmd_txt.get("1.0", tk.END).strip().splitlines()
         user    = self.user_entry.get()
         pwd     = self.pw_entry.get()
+        try:
+            workers = max(1, int(self.workers_spin.get()))
+        except ValueError:
+            workers = 1
 
-        for host in hosts:
-            self._append_log(f"🔌 Connecting to {host} over port 22...")
-            try:
-                theIP = ipaddress.ip_address(host)
-                conn = netmiko.ConnectHandler(
-                    host=theIP, device_type="cisco_ios",
-                    username=user, password=pwd
-                )
-                self._append_log(f"✅ Connected to {host}")
-                for cmd in cmds:
-                    self._append_log(f"📤 {cmd}")
-                    out = conn.send_command(cmd)
-                    self._append_log(f"📥 Output:\n{out}")
-                conn.disconnect()
-                self._append_log("🔒 Disconnected.\n")
-                logging.info('Finished _on_run function for host: {}.'.format(host))
-            except ValueError as val:
-                self._append_log(f"❌ {val}")
-                self._append_log("❌ Skipping {}\n".format(str(val).split(' ')[0]))
-                logging.error('{}'.format(val))
-                logging.error("Skipping {}".format(str(val).split(' ')[0]))
-            except Exception as e:
-                self._append_log(f"❌ {e}\n")
-                logging.error('There was an error connecting to: {}.'.format(host))
-
-        self._append_log("✅ Completed. Exiting.")
+        self._running = True
+        self._cancel.clear()
+        self._done = 0
+        self._total = len(hosts)
+        self.progress.config(maximum=max(len(hosts), 1), value=0)
+        self.progress_lbl.config(text=f"0 / {len(hosts)} hosts")
+        self.run_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
+        self.log_view.clear()
+        metrics.reset()
+        transcript_dir = self.log_view.start_transcript()
+        self._append_log(f"📝 Full transcripts -> {os.path.abspath(transcript_dir)}")
+        if self.structured_var.get():
+            records_path = os.path.join(transcript_dir, "records.jsonl")
+            self.records = JsonLinesWriter(open(records_path, "a", encoding="utf-8"))
+            self._append_log(f"🧾 Parsed records -> {os.path.abspath(records_path)}")
+
+        # Network I/O runs off the Tk thread; the UI only ever touches widgets from _poll_queue.
+        self._job_thread = threading.Thread(target=self._run_job, args=(hosts, cmds, user, pwd, workers), daemon=True)
+        self._job_thread.start()
+        self.after(50, self._poll_queue)
+
+    def _on_load_inventory(self):
+        """Fill the host box from an inventory file, optionally narrowed by a filter expression."""
+        path = filedialog.askopenfilename(title="Select inventory",
+                                          filetypes=[("Inventory", "*.csv *.json *.jsonl *.yaml *.yml *.txt"),
+                                                     ("All files", "*.*")])
+        if not path:
+            return
+        expression = simpledialog.askstring("Inventory filter",
+                                            "Filter (blank for all), e.g. group=core and site=nyc:", parent=self)
+        try:
+            hosts = {host.hostname: host for host in Inventory(path).filter(expression or None)}
+        except (OSError, ValueError, ImportError) as err:
+            messagebox.showerror("Inventory", str(err))
+            return
+        self._inventory_hosts = hosts
+        self._inventory_text = "\n".join(hosts)
+        self.host_txt.delete("1.0", tk.END)
+        self.host_txt.insert("1.0", self._inventory_text)
+        self._append_log(f"📋 Loaded {len(hosts)} hosts from {os.path.basename(path)}")
+        self.log_view.flush()
+
+    def _on_hosts_modified(self, event=None):
+        """A hand edit of the host box drops the loaded inventory, so no stale port/device_type is applied."""
+        self.host_txt.edit_modified(False)
+        if self._inventory_hosts and self.host_txt.get("1.0", "end-1c").strip() != self._inventory_text:
+            self._inventory_hosts = {}
+            self._inventory_text = ""
+            self._append_log("📋 Host list edited; inventory ports and device types no longer applied.")
+            self.log_view.flush()
+
+    def _on_cancel(self):
+        self._cancel.set()
+        self.cancel_btn.config(state="disabled")
+        self.log_queue.put(("log", (None, "⛔ Cancelling... running hosts stop after their current command.")))
+
+    def _run_job(self, hosts, cmds, user, pwd, workers):
+        startTime = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._run_host_timed, host, cmds, user, pwd) for host in hosts]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+                self.log_queue.put(("progress", None))
         finishedTime = time.perf_counter()
         logging.info(f"Finished _on_run function in {finishedTime - startTime:.4f} seconds")
+        self.log_queue.put(("done", finishedTime - startTime))
+
+    def _run_host_timed(self, host, cmds, user, pwd):
+        # Phase timings (dns/tcp_connect/login/command/disconnect) when NETOPS_METRICS=1.
+        with metrics.session(host):
+            self._run_host(host, cmds, user, pwd)
+
+    def _run_host(self, host, cmds, user, pwd):
+        """Worker thread: never touch Tk widgets here, post to log_queue instead."""
+        log = lambda msg: self.log_queue.put(("log", (host, msg)))
+        if self._cancel.is_set():
+            log(f"⛔ Skipped {host}")
+            return
+        # Hosts loaded from an inventory keep their own port and device_type.
+        entry = self._inventory_hosts.get(host)
+        port = entry.port if entry else "22"
+        device_type = entry.device_type if entry else "cisco_ios"
+        log(f"🔌 Connecting to {host} over port {port}...")
+        try:
+            theIP = ipaddress.ip_address(host)
+            conn = openConnection(dict(
+                host=str(theIP), device_type=device_type, port=int(port),
+                username=user, password=pwd
+            ))
+            try:
+                log(f"✅ Connected to {host}")
+                for cmd in cmds:
+                    if self._cancel.is_set():
+                        log(f"⛔ Cancelled {host}")
+                        break
+                    with metrics.timer("command"):
+                        out = conn.send_command(cmd)
+                    result, message = recordOutput(self.store, host, cmd, out)
+                    if result['previous'] is None:
+                        log(f"📤 {host}: {cmd}\n📥 Output:\n{out}")
+                    else:
+                        # The transcript on disk always gets the full output; the pane shows the diff.
+                        self.log_queue.put(("transcript", (host, f"📤 {host}: {cmd}\n📥 Output:\n{out}")))
+                        log(f"📤 {message}")
+                    if self.records is not None:
+                        records = self.parser.records(host, device_type, cmd, out)
+                        self.records.write(records)
+                        log("\n".join(json.dumps(record, default=str) for record in records))
+            finally:
+                closeConnection(conn)
+            log(f"🔒 Disconnected from {host}.\n")
+            logging.info('Finished _on_run function for host: {}.'.format(host))
+        except ValueError as val:
+            log(f"❌ {val}")
+            log("❌ Skipping {}\n".format(str(val).split(' ')[0]))
+            logging.error('{}'.format(val))
+            logging.error("Skipping {}".format(str(val).split(' ')[0]))
+        except Exception as e:
+            log(f"❌ {host}: {e}\n")
+            logging.error('There was an error connecting to: {}.'.format(host))
+
+    def _poll_queue(self):
+        finished = None
+        try:
+            while True:
+                kind, payload = self.log_queue.get_nowait()
+                if kind == "log":
+                    self._append_log(payload[1], host=payload[0])
+                elif kind == "transcript":
+                    self.log_view.write_transcript(payload[1], host=payload[0])
+                elif kind == "progress":
+                    self._done += 1
+                    self.progress.config(value=self._done)
+                    self.progress_lbl.config(text=f"{self._done} / {self._total} hosts")
+                elif kind == "done":
+                    finished = payload
+        except queue.Empty:
+            pass
+
+        if finished is None:
+            self.log_view.flush()
+            self.after(50, self._poll_queue)
+            return
+        status = "Cancelled" if self._cancel.is_set() else "Completed"
+        self._append_log(f"✅ {status} in {finished:.2f} seconds.")
+        self.log_view.flush()
+        if metrics.enabled and self.log_view.transcript_dir:
+            path = metrics.write(os.path.join(self.log_view.transcript_dir, "metrics.json"))
+            self._append_log(f"⏱️ Phase timings -> {os.path.abspath(path)}")
+            self.log_view.flush()
+        self.log_view.close_transcript()
+        if self.records is not None:
+            self.records.stream.close()
+            self.records = None
+        self.progress_lbl.config(text=f"{status}: {self._done} / {self._total} hosts")
+        self.run_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
+        self._running = False
+
+    def destroy(self):
+        # Workers write to the store, parser and records file; close them only once the job has finished.
+        if self._job_thread is not None and self._job_thread.is_alive():
+            if not self._closing:
+                self._closing = True
+                self._cancel.set()
+                self.run_btn.config(state="disabled")
+                self.cancel_btn.config(state="disabled")
+                self.progress_lbl.config(text="Closing after running hosts finish their current command...")
+            self.after(100, self.destroy)
+            return
+        self.log_view.close_transcript()
+        self.store.close()
+        self.parser.close()
+        if self.records is not None:
+            self.records.stream.close()
+            self.records = None
+        super().destroy()
 
-    def _append_log(self, msg):
-        self.log_txt.config(state="normal")
-        self.log_txt.insert(tk.END, msg + "\n")
-        self.log_txt.see(tk.END)
-        self.log_txt.config(state="disabled")
+    def _append_log(self, msg, host=None):
+        self.log_view.append(msg, host=host)
 
 if __name__ == "__main__":
     IOSXEScriptRunner().mainloop()
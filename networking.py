@@ -5,23 +5,52 @@ Author: Hunter R.
 Date: 2025-08-05
 """
 
-### Wrapper Function to log called function and report time performance and keyword arguments and positional arguments.
+import itertools
+import sys
+import types
+from instrumentation import metrics
+
+### Wrapper Function to time the called function. Arguments are never logged (they can hold credentials).
 def my_logging(func):
     import time
     import logging
+    import functools
+    label = 'function:' + func.__name__
+    logger = logging.getLogger()
+
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        logEnabled = logger.isEnabledFor(logging.INFO)
+        if not logEnabled and not metrics.enabled:
+            return func(*args, **kwargs)
         start_time = time.perf_counter()
-        result = func(*args, **kwargs)
-        end_time = time.perf_counter()
-        logging.info("Initializing {}() function.".format(func.__name__))
-        logging.info(
-            f"Finished running {func.__name__}() function with args={args}, kwargs={kwargs} "
-            f"in {end_time - start_time:.5f} seconds."
-        )
+        with metrics.timer(label):
+            result = func(*args, **kwargs)
+        if logEnabled:
+            logger.info("Finished running %s() function in %.5f seconds.", func.__name__,
+                        time.perf_counter() - start_time)
         return result
     return wrapper
 
 class networkingDevice:
+    """Connection details for one device.
+
+    Slotted, so a device is a handful of pointers with no per-instance __dict__; repeated values
+    (device_type, port, username) are interned by from_columns so a large fleet shares them.
+    Item lookups and connection_key read the slots directly; a dict is only built by
+    get_connection_info().
+    """
+
+    __slots__ = ('hostname', '_username', '_password', 'device_type', 'port')
+
+    # device['key'] -> value, without building the connection-info dict.
+    _ITEMS = {
+        'host': lambda device: device.hostname,
+        'port': lambda device: str(device.port),
+        'device_type': lambda device: device.device_type,
+        'username': lambda device: device._username,
+    }
+
     def __init__(self, hostname='', username='', password='', device_type='cisco_ios', port='22'):
         self.hostname = hostname
         self._username = username
@@ -29,6 +58,36 @@ class networkingDevice:
         self.device_type = device_type
         self.port = port
 
+    @classmethod
+    def from_columns(cls, hostnames, usernames='', device_types='cisco_ios', ports='22', password=''):
+        """Build many devices from columnar data.
+
+        hostnames is a sequence; every other argument is either a sequence of the same length or
+        a single value shared by all devices.
+        """
+        count = len(hostnames)
+
+        def column(values):
+            if isinstance(values, (str, int)):
+                return itertools.repeat(sys.intern(values) if isinstance(values, str) else values, count)
+            if len(values) != count:
+                raise ValueError("Column length {} does not match {} hostnames.".format(len(values), count))
+            return (sys.intern(value) if isinstance(value, str) else value for value in values)
+
+        new = cls.__new__
+        devices = []
+        append = devices.append
+        for hostname, username, device_type, port in zip(hostnames, column(usernames), column(device_types),
+                                                         column(ports)):
+            device = new(cls)
+            device.hostname = hostname
+            device._username = username
+            device._password = password
+            device.device_type = device_type
+            device.port = port
+            append(device)
+        return devices
+
     def __repr__(self):
         return (f"{self.__class__.__name__}(hostname={self.hostname!r}, "
                 f"username={self._username!r}, password=****, "
@@ -37,7 +96,8 @@ class networkingDevice:
     def __getitem__(self, item):
         if item == 'password':
             raise KeyError("Direct access to password is not allowed.")
-        return self.get_connection_info().get(item)
+        getter = self._ITEMS.get(item)
+        return getter(self) if getter is not None else None
 
     @property
     def password(self):
@@ -47,7 +107,18 @@ class networkingDevice:
     def password(self, password):
         raise AttributeError("Use: networkingDevice.set_password(password).")
 
+    @property
+    def connection_info(self):
+        """Read-only view of the connection info (never includes the password)."""
+        return types.MappingProxyType(self.get_connection_info())
+
+    @property
+    def connection_key(self):
+        """Hashable identity of the connection, e.g. for pooling sessions."""
+        return (self.hostname, str(self.port), self.device_type, self._username)
+
     def get_connection_info(self, include_password=False):
+        """A fresh dict the caller may modify, e.g. to add netmiko keyword arguments."""
         info = {
             'host': self.hostname,
             'port': str(self.port),
@@ -82,5 +153,3 @@ class networkingDevice:
                 self.set_device_type(value)
             elif key == 'port':
                 self.port = value
-
-
@@ -0,0 +1,223 @@
+"""
+Filename: outputParser.py
+Description: Parse show-command output into records with cached TextFSM/TTP templates and a process pool.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+
+# Outputs at least this many characters are parsed in a worker process instead of the caller's thread.
+POOL_THRESHOLD = 64 * 1024
+
+
+def defaultTemplateDir():
+    """NET_TEXTFSM if set (same variable netmiko honours), otherwise the installed ntc-templates."""
+    if os.environ.get('NET_TEXTFSM'):
+        return os.environ['NET_TEXTFSM']
+    try:
+        import ntc_templates
+    except ImportError:
+        return None
+    return os.path.join(os.path.dirname(ntc_templates.__file__), 'templates')
+
+
+class StructuredParser:
+    """Turn raw command output into a list of dicts.
+
+    Templates are looked up once per (device_type, command): an explicit entry in templates
+    ({(device_type, command): path}, .ttp files are parsed with TTP, anything else with TextFSM)
+    wins, otherwise the ntc-templates style index in template_dir is matched the same way
+    netmiko's use_textfsm does. Unlike use_textfsm, the index is loaded once and each template is
+    compiled once per thread (again only if the file's mtime changes) instead of on every call.
+    Outputs of POOL_THRESHOLD characters or more are handed to a process pool when workers > 0;
+    its processes are spawned, not forked, since the callers are usually threaded.
+    """
+
+    def __init__(self, template_dir=None, templates=None, workers=0, threshold=POOL_THRESHOLD):
+        self.template_dir = template_dir or defaultTemplateDir()
+        self.templates = dict(templates or {})
+        self.workers = workers
+        self.threshold = threshold
+        self._index = None
+        self._resolved = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pool = None
+        self.stats = {'parsed': 0, 'pooled': 0, 'resolved': 0, 'compiled': 0, 'unmatched': 0}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _cli_index(self):
+        if self._index is None:
+            from textfsm import clitable
+            if self.template_dir is None:
+                raise LookupError("No TextFSM template directory. Install ntc-templates or set NET_TEXTFSM.")
+            self._index = clitable.CliTable('index', self.template_dir)
+        return self._index
+
+    def resolve(self, device_type, command):
+        """Template path for (device_type, command), or None. Cached, including misses."""
+        key = (device_type, command)
+        with self._lock:
+            if key in self._resolved:
+                return self._resolved[key]
+            path = self.templates.get(key)
+            if path is None and self.template_dir is not None:
+                table = self._cli_index()
+                row = table.index.GetRowMatch({'Platform': device_type, 'Command': command})
+                if row:
+                    # Multi-template index rows are rare in ntc-templates; the first one is used.
+                    name = table.index.index[row]['Template'].split(':')[0].strip()
+                    path = os.path.join(self.template_dir, name)
+            self._resolved[key] = path
+            self.stats['resolved'] += 1
+            return path
+
+    def _compiled(self, path):
+        """Per-thread TextFSM or TTP object for path, rebuilt when the file's mtime changes.
+
+        Both keep parse state, so they are not shared between threads.
+        """
+        cache = getattr(self._local, 'compiled', None)
+        if cache is None:
+            cache = self._local.compiled = {}
+        key = (path, os.stat(path).st_mtime_ns)
+        compiled = cache.get(key)
+        if compiled is None:
+            with open(path, 'r') as file:
+                if path.endswith('.ttp'):
+                    import ttp
+                    compiled = ttp.ttp(template=file.read())
+                else:
+                    import textfsm
+                    compiled = textfsm.TextFSM(file)
+            cache[key] = compiled
+            with self._lock:
+                self.stats['compiled'] += 1
+        return compiled
+
+    def _parse_local(self, path, output):
+        if path.endswith('.ttp'):
+            parser = self._compiled(path)
+            parser.clear_input()
+            parser.clear_result()
+            parser.add_input(output)
+            parser.parse(one=True)
+            return parser.result(structure='flat_list')
+        fsm = self._compiled(path)
+        fsm.Reset()
+        header = [name.lower() for name in fsm.header]
+        return [dict(zip(header, row)) for row in fsm.ParseText(output)]
+
+    def parse(self, device_type, command, output):
+        """Records for one output. Raises LookupError when no template matches."""
+        path = self.resolve(device_type, command)
+        if path is None:
+            with self._lock:
+                self.stats['unmatched'] += 1
+            raise LookupError("No template for {} / {}.".format(device_type, command))
+        if self.workers and len(output) >= self.threshold:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+                self.stats['pooled'] += 1
+            records = self._pool.submit(_parseInWorker, path, output).result()
+        else:
+            records = self._parse_local(path, output)
+        with self._lock:
+            self.stats['parsed'] += 1
+        return records
+
+    def records(self, host, device_type, command, output):
+        """Dicts ready for JSON lines: one per parsed record, or a single error record."""
+        try:
+            parsed = self.parse(device_type, command, output)
+        except Exception as err:
+            return [{'host': host, 'command': command, 'error': '{}: {}'.format(type(err).__name__, err)}]
+        return [dict(record, host=host, command=command) for record in parsed]
+
+
+_workerParser = None
+
+
+def _parseInWorker(path, output):
+    """Process-pool entry point. Each worker process keeps its own compiled templates."""
+    global _workerParser
+    if _workerParser is None:
+        _workerParser = StructuredParser()
+    return _workerParser._parse_local(path, output)
+
+
+class JsonLinesWriter:
+    """Thread-safe JSON lines sink for the runner scripts."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, records):
+        text = ''.join(json.dumps(record, default=str) + '\n' for record in records)
+        with self._lock:
+            self.stream.write(text)
+            self.stream.flush()
+
+
+def main():
+    """Main Function."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                        handlers=[logging.StreamHandler(sys.stderr)])
+    parser = argparse.ArgumentParser(prog='outputParser.py',
+                                     add_help=True,
+                                     description='Parse saved command output into JSON lines.',
+                                     epilog='\nEnd of the help text.')
+    parser.add_argument('command', type=str, help='The command that produced the output, e.g. "show ip int br".')
+    parser.add_argument('files', nargs='+', help='Output files, one device per file. The file name is used as host.')
+    parser.add_argument('-d', '--device-type', metavar='<type>', dest='device_type', default='cisco_ios',
+                        help='[Optional] Netmiko device type. Default = cisco_ios')
+    parser.add_argument('-t', '--template', metavar='<file>', dest='template',
+                        help='[Optional] TextFSM or .ttp template to use instead of the ntc-templates index.')
+    parser.add_argument('-w', '--workers', metavar='<N>', dest='workers', type=int, default=os.cpu_count() or 1,
+                        help='[Optional] Parse processes. Default = CPU count')
+    args = parser.parse_args()
+
+    templates = {(args.device_type, args.command): args.template} if args.template else None
+    writer = JsonLinesWriter(sys.stdout)
+
+    def parseFile(path):
+        with open(path, 'r') as file:
+            output = file.read()
+        return structured.records(os.path.basename(path), args.device_type, args.command, output)
+
+    # Caller threads only wait on the process pool, so this keeps every worker process busy.
+    with StructuredParser(templates=templates, workers=args.workers, threshold=0) as structured, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=args.workers * 2) as executor:
+        for records in executor.map(parseFile, args.files):
+            writer.write(records)
+        logging.info("Parse stats: {}".format(structured.stats))
+    logging.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logging.warning("Interrupted by user.")
+        sys.exit(0)
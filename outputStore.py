@@ -0,0 +1,217 @@
+"""
+Filename: outputStore.py
+Description: Content-addressed, compressed history of show-command output keyed by (device, command).
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import argparse
+import datetime
+import difflib
+import hashlib
+import logging
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    size INTEGER,
+    data BLOB
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    device TEXT,
+    command TEXT,
+    taken REAL,
+    digest TEXT REFERENCES blobs(digest)
+);
+CREATE INDEX IF NOT EXISTS snapshots_key ON snapshots (device, command, taken);
+"""
+
+
+def normalize(output):
+    """Line endings differ between platforms and netmiko versions; store LF only."""
+    return output.replace('\r\n', '\n')
+
+
+def digestOf(output):
+    return hashlib.sha256(output.encode('utf-8')).hexdigest()
+
+
+class OutputStore:
+    """SQLite store of command output snapshots.
+
+    Each distinct output is kept once, zlib-compressed, under its SHA-256 digest; a snapshot row
+    records (device, command, time, digest). Re-collecting an unchanged output costs one small
+    row, and comparing against the previous run is a digest comparison before any text is diffed.
+    Safe to share between worker threads.
+    """
+
+    def __init__(self, database='outputs.db', level=6):
+        self.database = database
+        self.level = level
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _latest_row(self, device, command):
+        return self.connection.execute(
+            "SELECT taken, digest FROM snapshots WHERE device = ? AND command = ? "
+            "ORDER BY taken DESC, id DESC LIMIT 1", (device, command)).fetchone()
+
+    def put(self, device, command, output, taken=None):
+        """Record one output. Returns {'digest', 'changed', 'previous', 'previous_taken'}.
+
+        changed is False when the output is identical to the previous snapshot for the same
+        (device, command); previous is None the first time a pair is seen.
+        """
+        output = normalize(output)
+        digest = digestOf(output)
+        taken = time.time() if taken is None else taken
+        with self._lock, self.connection:
+            previous = self._latest_row(device, command)
+            exists = self.connection.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if exists is None:
+                raw = output.encode('utf-8')
+                data = zlib.compress(raw, self.level)
+                self.connection.execute("INSERT INTO blobs VALUES (?, ?, ?)", (digest, len(raw), data))
+            self.connection.execute("INSERT INTO snapshots (device, command, taken, digest) VALUES (?, ?, ?, ?)",
+                                    (device, command, taken, digest))
+        return {'digest': digest,
+                'changed': previous is None or previous[1] != digest,
+                'previous': previous[1] if previous else None,
+                'previous_taken': previous[0] if previous else None}
+
+    def get(self, digest):
+        with self._lock:
+            row = self.connection.execute("SELECT data FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def latest(self, device, command):
+        """Most recent output for (device, command), or None."""
+        with self._lock:
+            row = self._latest_row(device, command)
+        return self.get(row[1]) if row else None
+
+    def history(self, device, command, limit=None):
+        """[(taken, digest), ...] newest first."""
+        query = "SELECT taken, digest FROM snapshots WHERE device = ? AND command = ? ORDER BY taken DESC, id DESC"
+        params = (device, command)
+        if limit:
+            query += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            return self.connection.execute(query, params).fetchall()
+
+    def diff_digests(self, old, new, fromfile='previous', tofile='current', context=3):
+        """Unified diff lines between two stored outputs; empty when the digests match."""
+        if old == new:
+            return []
+        return list(difflib.unified_diff(self.get(old).splitlines(), self.get(new).splitlines(),
+                                         fromfile=fromfile, tofile=tofile, lineterm='', n=context))
+
+    def diff(self, device, command, back=1, context=3):
+        """Diff the newest snapshot of (device, command) against the one back snapshots earlier."""
+        rows = self.history(device, command, limit=back + 1)
+        if len(rows) <= back:
+            return []
+        (newTaken, new), (oldTaken, old) = rows[0], rows[back]
+        return self.diff_digests(old, new, fromfile=_stamp(oldTaken), tofile=_stamp(newTaken), context=context)
+
+    def devices(self):
+        with self._lock:
+            return self.connection.execute(
+                "SELECT device, command, COUNT(*), MAX(taken) FROM snapshots GROUP BY device, command "
+                "ORDER BY device, command").fetchall()
+
+    def stats(self):
+        with self._lock:
+            snapshots, = self.connection.execute("SELECT COUNT(*) FROM snapshots").fetchone()
+            blobs, raw, stored = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs").fetchone()
+        return {'snapshots': snapshots, 'unique_outputs': blobs, 'raw_bytes': raw, 'stored_bytes': stored}
+
+
+def _stamp(taken):
+    return datetime.datetime.fromtimestamp(taken).isoformat(timespec='seconds')
+
+
+def recordOutput(store, device, command, output):
+    """Store output and return (result, message) where message is a short log line: first
+    snapshot, unchanged, or the diff against the previous run."""
+    result = store.put(device, command, output)
+    if result['previous'] is None:
+        return result, "{} | {}: first snapshot stored.".format(device, command)
+    if not result['changed']:
+        return result, "{} | {}: unchanged since {}.".format(device, command, _stamp(result['previous_taken']))
+    lines = store.diff_digests(result['previous'], result['digest'],
+                               fromfile=_stamp(result['previous_taken']), tofile='now')
+    return result, "{} | {}: changed since {}:\n{}".format(device, command, _stamp(result['previous_taken']),
+                                                          '\n'.join(lines))
+
+
+def main():
+    """Main Function."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                        handlers=[logging.StreamHandler(sys.stderr)])
+    parser = argparse.ArgumentParser(prog='outputStore.py',
+                                     add_help=True,
+                                     description='Query stored show-command output without touching the network.',
+                                     epilog='\nEnd of the help text.')
+    parser.add_argument('-d', '--database', metavar='<db>', dest='database', default='outputs.db',
+                        help='[Optional] Store file. Default = outputs.db')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    subparsers.add_parser('list', help='Every (device, command) with snapshot count and last time.')
+    subparsers.add_parser('stats', help='Snapshot, dedupe and compression totals.')
+    for name, text in (('show', 'Print the newest output.'), ('history', 'List snapshots, newest first.'),
+                       ('diff', 'Diff the newest output against an earlier snapshot.')):
+        sub = subparsers.add_parser(name, help=text)
+        sub.add_argument('device')
+        sub.add_argument('command')
+        if name == 'diff':
+            sub.add_argument('-b', '--back', type=int, default=1, help='Snapshots back to compare against. Default = 1')
+    args = parser.parse_args()
+
+    with OutputStore(args.database) as store:
+        if args.action == 'list':
+            for device, command, count, last in store.devices():
+                print("{}\t{}\t{} snapshots\tlast {}".format(device, command, count, _stamp(last)))
+        elif args.action == 'stats':
+            for key, value in store.stats().items():
+                print("{}: {}".format(key, value))
+        elif args.action == 'show':
+            output = store.latest(args.device, args.command)
+            if output is None:
+                logging.error("No snapshots for {} | {}.".format(args.device, args.command))
+                sys.exit(1)
+            print(output)
+        elif args.action == 'history':
+            for taken, digest in store.history(args.device, args.command):
+                print("{}\t{}".format(_stamp(taken), digest[:12]))
+        elif args.action == 'diff':
+            print('\n'.join(store.diff(args.device, args.command, back=args.back)))
+    logging.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logging.warning("Interrupted by user.")
+        sys.exit(0)
@@ -0,0 +1,362 @@
+"""
+Filename: prefixIndex.py
+Description: Longest-prefix-match, containment and overlap index for large IPv4/IPv6 prefix lists.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import argparse
+import array
+import bisect
+import ipaddress
+import logging
+import pickle
+import sys
+import time
+from subnetBatch import parsePrefix
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ️ Configure logging
+logging.basicConfig(
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler(sys.stderr)],
+    level=logging.INFO,
+)
+
+INDEX_FORMAT = 2
+_BITS = {4: 32, 6: 128}
+
+
+class _Family:
+    """Index for one address family.
+
+    Nested prefixes are flattened into sorted, non-overlapping ranges, each owned by the most
+    specific prefix covering it, so a longest-prefix match is a single bisect. IPv4 range starts
+    are stored in a compact array('Q'); IPv6 needs Python ints.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.bits = _BITS[version]
+        self.starts = array.array('Q') if version == 4 else []
+        self.owners = array.array('l')
+        # Per prefix, in (start, prefixlen) order.
+        self.prefix_start = array.array('Q') if version == 4 else []
+        self.prefix_len = array.array('B')
+        self.parent = array.array('l')
+        self.values = []
+        self._names = {}
+
+    def build(self, entries):
+        """entries: dict of (network, prefixlen) -> value."""
+        ordered = sorted(entries.items())
+        stack = []   # (end, prefix id)
+        # Inventories repeat a few labels across many prefixes; share one object per label so the
+        # values list (and a saved index) holds each string once.
+        shared = {}
+
+        def emit(position, owner):
+            if self.starts and self.starts[-1] == position:
+                self.owners[-1] = owner
+                if len(self.owners) > 1 and self.owners[-2] == owner:
+                    self.starts.pop()
+                    self.owners.pop()
+            elif not self.owners or self.owners[-1] != owner:
+                self.starts.append(position)
+                self.owners.append(owner)
+
+        for pid, ((network, prefixlen), value) in enumerate(ordered):
+            end = network | ((1 << (self.bits - prefixlen)) - 1)
+            while stack and stack[-1][0] < network:
+                top = stack.pop()[0]
+                emit(top + 1, stack[-1][1] if stack else -1)
+            self.prefix_start.append(network)
+            self.prefix_len.append(prefixlen)
+            self.parent.append(stack[-1][1] if stack else -1)
+            try:
+                value = shared.setdefault(value, value)
+            except TypeError:
+                pass
+            self.values.append(value)
+            emit(network, pid)
+            stack.append((end, pid))
+        while stack:
+            top = stack.pop()[0]
+            if top + 1 < (1 << self.bits):
+                emit(top + 1, stack[-1][1] if stack else -1)
+
+    def owner(self, value):
+        idx = bisect.bisect_right(self.starts, value) - 1
+        return self.owners[idx] if idx >= 0 else -1
+
+    def prefix(self, pid):
+        # Formatted on first use only; hot prefixes in log enrichment hit this cache.
+        name = self._names.get(pid)
+        if name is None:
+            address = ipaddress.IPv4Address(self.prefix_start[pid]) if self.version == 4 \
+                else ipaddress.IPv6Address(self.prefix_start[pid])
+            name = self._names[pid] = f"{address}/{self.prefix_len[pid]}"
+        return name
+
+    def __len__(self):
+        return len(self.prefix_len)
+
+    def __getstate__(self):
+        # The formatted-name cache is rebuilt on demand; keep it out of saved indexes.
+        state = dict(self.__dict__)
+        state['_names'] = {}
+        return state
+
+    def entries(self):
+        """The (network, prefixlen) -> value dict this family was built from."""
+        return {(self.prefix_start[pid], self.prefix_len[pid]): self.values[pid] for pid in range(len(self))}
+
+
+class PrefixIndex:
+    """Load prefixes once, then answer "which subnet owns this IP" without scanning.
+
+    idx = PrefixIndex.from_file('routes.txt')   # one "prefix[,value]" per line
+    idx.lookup('10.1.2.3')                       # -> ('10.1.2.0/24', 'site-a') or None
+    idx.covering('10.1.2.3')                     # every prefix containing the address, most specific first
+    idx.overlaps('10.1.0.0/16')                  # every indexed prefix overlapping the query
+    """
+
+    def __init__(self):
+        self._pending = {4: {}, 6: {}}
+        self._families = None
+
+    def add(self, prefix, value=None):
+        """Add a prefix. Host bits are ignored, so 10.1.1.1/24 is stored as 10.1.1.0/24."""
+        version, address, prefixlen = parsePrefix(prefix)
+        bits = _BITS[version]
+        network = address & (((1 << bits) - 1) ^ ((1 << (bits - prefixlen)) - 1))
+        if self._pending is None:
+            # Loaded from disk: recover the prefix dict from the arrays only now that it is needed.
+            self._pending = {version: family.entries() for version, family in self._families.items()}
+        self._pending[version][(network, prefixlen)] = value
+        self._families = None
+
+    def build(self):
+        if self._pending is None:
+            return self
+        families = {}
+        for version, entries in self._pending.items():
+            family = _Family(version)
+            family.build(entries)
+            families[version] = family
+        self._families = families
+        return self
+
+    def _family(self, version):
+        if self._families is None:
+            self.build()
+        return self._families[version]
+
+    def __len__(self):
+        if self._pending is None:
+            return sum(len(family) for family in self._families.values())
+        return sum(len(entries) for entries in self._pending.values())
+
+    @staticmethod
+    def _parse_address(address, version=None):
+        """(version, int) for an address string, ipaddress object or int.
+
+        An int is ambiguous (::1 and 0.0.0.1 are both 1), so pass version=6 for IPv6 integers;
+        without it, ints below 2**32 are read as IPv4.
+        """
+        if isinstance(address, int):
+            if version is None:
+                version = 4 if address < (1 << 32) else 6
+            elif version not in _BITS:
+                raise ValueError(f"version must be 4 or 6, got {version!r}")
+            if not 0 <= address < (1 << _BITS[version]):
+                raise ValueError(f"{address} is not an IPv{version} address")
+            return version, address
+        parsedVersion, value, prefixlen = parsePrefix(str(address))
+        if version is not None and version != parsedVersion:
+            raise ValueError(f"{address} is not an IPv{version} address")
+        return parsedVersion, value
+
+    def lookup(self, address, version=None):
+        """Longest-prefix match. Returns (prefix, value) or None. version= is needed for IPv6 ints."""
+        version, value = self._parse_address(address, version)
+        family = self._family(version)
+        pid = family.owner(value)
+        if pid < 0:
+            return None
+        return family.prefix(pid), family.values[pid]
+
+    def lookup_many(self, addresses, version=None):
+        """Yield lookup() for each address. Skips re-resolving the family between IPv4 lookups."""
+        family4 = self._family(4)
+        starts, owners, values = family4.starts, family4.owners, family4.values
+        bisect_right = bisect.bisect_right
+        for address in addresses:
+            if isinstance(address, int) and version in (None, 4) and 0 <= address < 0x100000000:
+                value = address
+            else:
+                addressVersion, value = self._parse_address(address, version)
+                if addressVersion != 4:
+                    yield self.lookup(value, 6)
+                    continue
+            idx = bisect_right(starts, value) - 1
+            pid = owners[idx] if idx >= 0 else -1
+            yield None if pid < 0 else (family4.prefix(pid), values[pid])
+
+    def match_ids(self, values):
+        """Longest-prefix match for a batch of IPv4 integers, returning the owning prefix id (-1 for none).
+
+        Uses a single numpy searchsorted over the range table when numpy is installed, which is the
+        path for millions of lookups per second; falls back to bisect otherwise. Resolve ids with
+        prefix_of(pid) / value_of(pid).
+        """
+        family4 = self._family(4)
+        if np is not None and len(family4.starts):
+            starts = np.frombuffer(family4.starts, dtype=np.uint64)
+            owners = np.frombuffer(family4.owners, dtype=np.dtype('l'))
+            idx = np.searchsorted(starts, np.asarray(values, dtype=np.uint64), side='right') - 1
+            return np.where(idx >= 0, owners[np.maximum(idx, 0)], -1)
+        starts, owners, bisect_right = family4.starts, family4.owners, bisect.bisect_right
+        result = array.array('l')
+        for value in values:
+            idx = bisect_right(starts, value) - 1
+            result.append(owners[idx] if idx >= 0 else -1)
+        return result
+
+    def prefix_of(self, pid, version=4):
+        return self._family(version).prefix(pid)
+
+    def value_of(self, pid, version=4):
+        return self._family(version).values[pid]
+
+    def __contains__(self, address):
+        version, value = self._parse_address(address)
+        return self._family(version).owner(value) >= 0
+
+    def covering(self, address, version=None):
+        """Every indexed prefix containing the address, most specific first."""
+        version, value = self._parse_address(address, version)
+        family = self._family(version)
+        result = []
+        pid = family.owner(value)
+        while pid >= 0:
+            result.append((family.prefix(pid), family.values[pid]))
+            pid = family.parent[pid]
+        return result
+
+    def overlaps(self, prefix):
+        """Every indexed prefix that overlaps the query prefix: supernets of it and prefixes inside it."""
+        version, address, prefixlen = parsePrefix(prefix)
+        family = self._family(version)
+        bits = family.bits
+        start = address & (((1 << bits) - 1) ^ ((1 << (bits - prefixlen)) - 1))
+        end = start | ((1 << (bits - prefixlen)) - 1)
+
+        result = []
+        # Supernets (and an exact match) through the parent chain of the owner of the first address.
+        pid = family.owner(start)
+        while pid >= 0:
+            if family.prefix_len[pid] <= prefixlen:
+                result.append((family.prefix(pid), family.values[pid]))
+            pid = family.parent[pid]
+        result.reverse()
+        # Prefixes that start inside the query and are more specific than it.
+        first = bisect.bisect_left(family.prefix_start, start)
+        last = bisect.bisect_right(family.prefix_start, end)
+        for pid in range(first, last):
+            if family.prefix_len[pid] > prefixlen:
+                result.append((family.prefix(pid), family.values[pid]))
+        return result
+
+    @classmethod
+    def from_lines(cls, lines, separator=','):
+        index = cls()
+        for line in lines:
+            text = line.strip()
+            if not text or text.startswith('#'):
+                continue
+            prefix, _, value = text.partition(separator)
+            try:
+                index.add(prefix.strip(), value.strip() or None)
+            except (OSError, ValueError) as err:
+                logging.warning(f"Skipping {text!r}: {err}")
+        return index.build()
+
+    @classmethod
+    def from_file(cls, path, separator=','):
+        with open(path, 'r') as file:
+            return cls.from_lines(file, separator=separator)
+
+    def save(self, path):
+        """Write the built index (flattened arrays and values only).
+
+        Only load files you created yourself, the format is pickle.
+        """
+        if self._families is None:
+            self.build()
+        with open(path, 'wb') as file:
+            pickle.dump({'format': INDEX_FORMAT, 'families': self._families}, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            data = pickle.load(file)
+        if data.get('format') != INDEX_FORMAT:
+            raise ValueError(f"Unsupported index format in {path}: {data.get('format')}")
+        index = cls()
+        index._pending = None
+        index._families = data['families']
+        return index
+
+
+def main():
+    """Main Function."""
+    startTime = time.perf_counter()
+    parser = argparse.ArgumentParser(prog='prefixIndex.py',
+                                     add_help=True,
+                                     description='Build a prefix index and enrich addresses with their longest-prefix match.',
+                                     epilog='\nEnd of the help text.')
+    subParser = parser.add_subparsers(title='subcommands', dest='command', required=True)
+    build_parser = subParser.add_parser('build', help='Build an index file from a "prefix[,value]" list.')
+    build_parser.add_argument('prefixes', type=str, help='File with one prefix per line, optionally followed by ,value.')
+    build_parser.add_argument('index', type=str, help='Index file to write.')
+    lookup_parser = subParser.add_parser('lookup', help='Read addresses from stdin and print address,prefix,value.')
+    lookup_parser.add_argument('index', type=str, help='Index file (or a prefix list ending in .txt/.csv).')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = PrefixIndex.from_file(args.prefixes)
+        index.save(args.index)
+        logging.info(f'Indexed {len(index)} prefixes in {time.perf_counter() - startTime:.4f}s')
+    else:
+        if args.index.endswith(('.txt', '.csv')):
+            index = PrefixIndex.from_file(args.index)
+        else:
+            index = PrefixIndex.load(args.index)
+        logging.info(f'Loaded {len(index)} prefixes in {time.perf_counter() - startTime:.4f}s')
+        count = 0
+        for line in sys.stdin:
+            address = line.strip()
+            if not address:
+                continue
+            try:
+                match = index.lookup(address)
+            except (OSError, ValueError):
+                match = None
+            prefix, value = match if match else ('', '')
+            sys.stdout.write(f"{address},{prefix},{value or ''}\n")
+            count += 1
+        logging.info(f'Looked up {count} addresses in {time.perf_counter() - startTime:.4f}s')
+    logging.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logging.warning("Interrupted by user.")
+        sys.exit(0)
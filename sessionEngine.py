@@ -0,0 +1,180 @@
+"""
+Filename: sessionEngine.py
+Description: Asyncio execution engine for running commands against many networkingDevice objects concurrently.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import netmiko
+from instrumentation import metrics, openConnection, closeConnection
+
+
+class AsyncSessionEngine:
+    """Run a list of commands against many devices with bounded concurrency.
+
+    Netmiko is a blocking library, so each live session still runs on its own daemon thread.
+    At most limit sessions run at once and every device waiting for a slot is just a suspended
+    coroutine, so 5,000 queued devices do not cost 5,000 OS threads. A session that times out
+    cannot be interrupted; its thread is left to finish on its own and the slot is handed to the
+    next device straight away, so hung sessions never delay healthy ones.
+    With a StructuredParser from outputParser, each output is also parsed into result['records'].
+    """
+
+    def __init__(self, limit=20, timeout=120, read_timeout=30, conn_timeout=15, pool=None, parser=None):
+        self.limit = max(1, int(limit))
+        self.pool = pool
+        self.parser = parser
+        self.timeout = timeout
+        self.read_timeout = read_timeout
+        self.conn_timeout = conn_timeout
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop scheduling new devices and ask running sessions to stop after their current command."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def _new_result(self, device):
+        return {'host': device['host'],
+                'port': device['port'],
+                'status': 'pending',
+                'output': {},
+                'records': {},
+                'error': '',
+                'elapsed': 0.0}
+
+    def _connect(self, device):
+        info = device.get_connection_info(include_password=True)
+        info['conn_timeout'] = self.conn_timeout
+        return openConnection(info)
+
+    def _send_commands(self, connection, commands, result, stop):
+        for cmd in commands:
+            if stop.is_set():
+                return result
+            if self._cancelled.is_set():
+                result['status'] = 'cancelled'
+                return result
+            with metrics.timer('command'):
+                result['output'][cmd] = connection.send_command(cmd, read_timeout=self.read_timeout)
+            if self.parser is not None:
+                result['records'][cmd] = self.parser.records(result['host'], connection.device_type, cmd,
+                                                             result['output'][cmd])
+        if not stop.is_set():
+            result['status'] = 'success'
+        return result
+
+    def _run_device(self, device, commands, result, stop):
+        """Blocking worker: connect, run every command and disconnect. Runs on its own thread.
+
+        result is private to this thread; _run_one copies from it only if the session finished in time.
+        """
+        with metrics.session(device['host']):
+            if self.pool is not None:
+                with self.pool.session(device, conn_timeout=self.conn_timeout) as connection:
+                    return self._send_commands(connection, commands, result, stop)
+
+            connection = self._connect(device)
+            try:
+                return self._send_commands(connection, commands, result, stop)
+            finally:
+                closeConnection(connection)
+
+    @staticmethod
+    def _start_thread(loop, function, name):
+        """Run function on a new daemon thread and return an asyncio future for its result."""
+        future = loop.create_future()
+
+        def settle(value, error):
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+        def target():
+            try:
+                value, error = function(), None
+            except BaseException as err:
+                value, error = None, err
+            try:
+                loop.call_soon_threadsafe(settle, value, error)
+            except RuntimeError:
+                # The run already returned and its loop is closed; nobody is waiting for this session.
+                pass
+
+        threading.Thread(target=target, name=name, daemon=True).start()
+        return future
+
+    async def _run_one(self, device, commands, semaphore):
+        result = self._new_result(device)
+        async with semaphore:
+            if self._cancelled.is_set():
+                result['status'] = 'cancelled'
+                return result
+
+            startTime = time.perf_counter()
+            stop = threading.Event()
+            work = self._new_result(device)
+            logging.info("Connecting to {} over {} ".format(result['host'], result['port']))
+
+            try:
+                future = self._start_thread(asyncio.get_running_loop(),
+                                            lambda: self._run_device(device, commands, work, stop),
+                                            'session-{}'.format(result['host']))
+                await asyncio.wait_for(future, timeout=self.timeout)
+                result.update(status=work['status'], output=work['output'], records=work['records'])
+            except asyncio.TimeoutError:
+                # The blocking call cannot be interrupted; flag it so it stops after the current command.
+                stop.set()
+                result['status'] = 'timeout'
+                result['error'] = 'Timed out after {} seconds.'.format(self.timeout)
+            except asyncio.CancelledError:
+                stop.set()
+                result['status'] = 'cancelled'
+                raise
+            except (ValueError, TimeoutError, netmiko.exceptions.NetMikoTimeoutException,
+                    netmiko.exceptions.NetMikoAuthenticationException) as err:
+                result['status'] = 'failed'
+                result['error'] = str(err)
+            except Exception as err:
+                result['status'] = 'failed'
+                result['error'] = '{}: {}'.format(type(err).__name__, err)
+            result['elapsed'] = round(time.perf_counter() - startTime, 5)
+
+        if result['status'] == 'success':
+            logging.info("Finished {} in {} seconds.".format(result['host'], result['elapsed']))
+        else:
+            logging.error("{} -> {} {}".format(result['host'], result['status'], result['error']))
+        return result
+
+    async def run(self, devices, commands):
+        """Run commands on every device and return one result dict per device, in input order."""
+        self._cancelled.clear()
+        semaphore = asyncio.Semaphore(self.limit)
+        tasks = [asyncio.create_task(self._run_one(device, commands, semaphore)) for device in devices]
+        try:
+            return await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            self.cancel()
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def run_sync(self, devices, commands):
+        """Convenience wrapper for the synchronous runner scripts."""
+        return asyncio.run(self.run(devices, commands))
+
+
+def runCommands(devices, commands, limit=20, timeout=120, parser=None):
+    """Run commands against a list of networkingDevice objects and return the per-device results."""
+    engine = AsyncSessionEngine(limit=limit, timeout=timeout, parser=parser)
+    return engine.run_sync(devices, commands)
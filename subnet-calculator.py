@@ -74,16 +74,19 @@ def showResults(parent, resultData):
     # Paging controls
     hosts = resultData["Available Hosts"]
     page_size = 10
+    page_count = max((hosts.count + page_size - 1) // page_size, 1)
     current_page = [0]
+    page_label = ttk.Label(content)
 
     def update_page():
         start = current_page[0] * page_size
         end = start + page_size
-        text = "\n".join(hosts[start:end]) or "— none —"
+        text = "\n".join(str(ip) for ip in hosts[start:end]) or "— none —"
         host_display.config(state="normal")
         host_display.delete("1.0", tk.END)
         host_display.insert(tk.END, text)
         host_display.config(state="disabled")
+        page_label.config(text=f"Page {current_page[0] + 1:,} of {page_count:,}")
 
     def prev_page():
         if current_page[0] > 0:
@@ -91,26 +94,82 @@ def showResults(parent, resultData):
             update_page()
 
     def next_page():
-        if (current_page[0] + 1) * page_size < len(hosts):
+        if current_page[0] + 1 < page_count:
             current_page[0] += 1
             update_page()
 
-    update_page()
+    def goto_page(event=None):
+        try:
+            page = int(page_entry.get().replace(",", "")) - 1
+        except ValueError:
+            return
+        current_page[0] = min(max(page, 0), page_count - 1)
+        update_page()
+
     ctrl_frame = ttk.Frame(content, padding=(0,10))
     ctrl_frame.grid(row=row, column=0, columnspan=2)
     ttk.Button(ctrl_frame, text="⟨ Prev", command=prev_page).pack(side="left", padx=5)
     ttk.Button(ctrl_frame, text="Next ⟩", command=next_page).pack(side="left", padx=5)
+    page_entry = ttk.Entry(ctrl_frame, width=12)
+    page_entry.pack(side="left", padx=5)
+    page_entry.bind("<Return>", goto_page)
+    ttk.Button(ctrl_frame, text="Go", command=goto_page).pack(side="left", padx=5)
+    row += 1
+    page_label.grid(row=row, column=0, columnspan=2)
     row += 1
+    update_page()
 
     # Close button
     ttk.Button(content, text="Close", command=win.destroy) \
         .grid(row=row, column=0, columnspan=2, pady=(10,0))
 
+class HostRange:
+    """Lazy, index-addressable view of the usable hosts in a network.
+
+    Matches ipaddress.ip_network().hosts() but computes each address from the network address,
+    so hosts[n] and hosts[a:b] are O(1)/O(b-a) for any prefix size, including a /8 or a /64.
+    """
+
+    def __init__(self, net):
+        self.net = net
+        first = int(net.network_address)
+        last = int(net.broadcast_address)
+        if net.num_addresses > 2:
+            # IPv4 drops the network and broadcast addresses, IPv6 only the Subnet-Router anycast address.
+            first += 1
+            if net.version == 4:
+                last -= 1
+        self._first = first
+        self.count = last - first + 1
+        self._address = ipaddress.IPv4Address if net.version == 4 else ipaddress.IPv6Address
+
+    def __len__(self):
+        # len() is limited to sys.maxsize; use .count for very large IPv6 networks.
+        return self.count
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.count)
+            return [self._address(self._first + idx) for idx in range(start, stop, step)]
+        if item < 0:
+            item += self.count
+        if not 0 <= item < self.count:
+            raise IndexError("host index out of range")
+        return self._address(self._first + item)
+
+    def __iter__(self):
+        for value in range(self._first, self._first + self.count):
+            yield self._address(value)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.net!s}, count={self.count})"
+
+
 def networkEval(networkBoth):
     iface = ipaddress.ip_interface(networkBoth)
     net = iface.network
 
-    hosts = [str(ip) for idx, ip in enumerate(net.hosts()) if idx < 512]
+    hosts = HostRange(net)
     return {
         "Network Address": str(net.network_address),
         "Broadcast Address": str(net.broadcast_address),
@@ -123,6 +182,69 @@ def networkEval(networkBoth):
         "Available Hosts": hosts
     }
 
+def showPlanner(parent):
+    import subnetPlanner
+
+    win = tk.Toplevel(parent)
+    win.title("Subnet Planner")
+    win.geometry("520x620")
+    win.configure(background="#F5F5F5")
+
+    content = ttk.Frame(win, padding=15)
+    content.grid(sticky="NSEW")
+    content.columnconfigure(1, weight=1)
+
+    ttk.Label(content, text="Parent Block:").grid(row=0, column=0, sticky="W", pady=2)
+    parent_entry = ttk.Entry(content, width=30)
+    parent_entry.insert(0, "10.0.0.0/16")
+    parent_entry.grid(row=0, column=1, sticky="EW", pady=2)
+
+    mode = tk.StringVar(value="vlsm")
+    mode_frame = ttk.Frame(content)
+    mode_frame.grid(row=1, column=0, columnspan=2, sticky="W", pady=5)
+    for text, value in (("VLSM", "vlsm"), ("Aggregate", "aggregate"), ("Free Space", "free")):
+        ttk.Radiobutton(mode_frame, text=text, value=value, variable=mode).pack(side="left", padx=5)
+
+    ttk.Label(content, text="Input (name,hosts for VLSM or one prefix per line):").grid(row=2, column=0, columnspan=2, sticky="W")
+    input_txt = scrolledtext.ScrolledText(content, height=8, font=("Consolas", 9))
+    input_txt.grid(row=3, column=0, columnspan=2, sticky="NSEW", pady=2)
+
+    ttk.Label(content, text="Used Prefixes (VLSM / Free Space):").grid(row=4, column=0, columnspan=2, sticky="W")
+    used_txt = scrolledtext.ScrolledText(content, height=5, font=("Consolas", 9))
+    used_txt.grid(row=5, column=0, columnspan=2, sticky="NSEW", pady=2)
+
+    result_txt = scrolledtext.ScrolledText(content, height=10, state="disabled", font=("Consolas", 9))
+    result_txt.grid(row=7, column=0, columnspan=2, sticky="NSEW", pady=2)
+
+    def lines(widget):
+        return [line.strip() for line in widget.get("1.0", tk.END).splitlines() if line.strip()]
+
+    def run():
+        try:
+            if mode.get() == "aggregate":
+                output = subnetPlanner.aggregate(lines(input_txt))
+            elif mode.get() == "free":
+                output = subnetPlanner.freeSpace(parent_entry.get(), lines(used_txt) + lines(input_txt))
+            else:
+                requirements = []
+                for line in lines(input_txt):
+                    name, _, hosts = line.rpartition(",")
+                    requirements.append((name or hosts, int(hosts)))
+                output = [f"{item['name']:<20} {item['hosts']:>8} -> {item['prefix'] or 'NO SPACE'}"
+                          for item in subnetPlanner.vlsm(parent_entry.get(), requirements, lines(used_txt))]
+            text = "\n".join(output) or "— none —"
+        except (OSError, ValueError) as err:
+            text = f"Error: {err}"
+        result_txt.config(state="normal")
+        result_txt.delete("1.0", tk.END)
+        result_txt.insert(tk.END, text)
+        result_txt.config(state="disabled")
+
+    btn_frame = ttk.Frame(content, padding=(0,10))
+    btn_frame.grid(row=6, column=0, columnspan=2)
+    ttk.Button(btn_frame, text="Plan", command=run).pack(side="left", padx=5)
+    ttk.Button(btn_frame, text="Close", command=win.destroy).pack(side="left", padx=5)
+
 def windowCreation():
     root = tk.Tk()
     configure_style(root)
@@ -150,13 +272,56 @@ def windowCreation():
     ttk.Button(btn_frame, text="Run",
                command=lambda: showResults(root, networkEval(net_entry.get()))) \
         .pack(side="left", padx=10)
+    ttk.Button(btn_frame, text="Plan", command=lambda: showPlanner(root)) \
+        .pack(side="left", padx=10)
     ttk.Button(btn_frame, text="Quit", command=root.destroy) \
         .pack(side="left", padx=10)
 
     root.mainloop()
 
+def callParser():
+    parser = argparse.ArgumentParser(prog='subnet-calculator.py',
+                                     add_help=True,
+                                     description='Subnet Calculator. Starts the GUI when no subcommand is given.',
+                                     epilog='\nEnd of the help text.')
+    subParser = parser.add_subparsers(title='subcommands', dest='command')
+    batch_parser = subParser.add_parser('batch', help='Evaluate a list of prefixes without the GUI.')
+    batch_parser.add_argument('input', nargs='?', default='-', help='File with one prefix per line. Default = stdin')
+    batch_parser.add_argument('-f', '--format', choices=['csv', 'json'], default='csv', dest='format',
+                              help='[Optional] Output format. json writes JSON lines. Default = csv')
+    batch_parser.add_argument('-o', '--output', metavar='<file>', default='-', dest='output',
+                              help='[Optional] Output file. Default = stdout')
+    return parser.parse_args()
+
+def runBatch(args):
+    import subnetBatch
+    start = time.perf_counter()
+    infile = sys.stdin if args.input == '-' else open(args.input, 'r')
+    outfile = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        rows = subnetBatch.evaluateBatch(infile)
+        if args.format == 'json':
+            count = subnetBatch.writeJson(rows, outfile)
+        else:
+            count = subnetBatch.writeCsv(rows, outfile)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+    elapsed = time.perf_counter() - start
+    logging.info(f'Evaluated {count} prefixes in {elapsed:.4f}s')
+
 def main():
     start = time.perf_counter()
+    args = callParser()
+
+    if args.command == 'batch':
+        # Keep stdout clean for the results.
+        logging.getLogger().handlers[0].setStream(sys.stderr)
+        runBatch(args)
+        logging.shutdown()
+        return
 
     logging.info("Starting GUI...")
 
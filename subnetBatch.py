@@ -0,0 +1,190 @@
+"""
+Filename: subnetBatch.py
+Description: Headless batch version of subnet-calculator networkEval for large prefix lists.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import bisect
+import csv
+import ipaddress
+import json
+import logging
+import socket
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FIELDS = ["Prefix",
+          "Network Address",
+          "Broadcast Address",
+          "Subnet Mask",
+          "Wildcard Mask",
+          "Private Network Space",
+          "Public Network Space",
+          "Total Number of Hosts",
+          "Number of Usable Hosts"]
+
+CHUNK_SIZE = 65536
+
+# Same special-purpose blocks ipaddress uses for is_private / is_global.
+_V4_PRIVATE = ["0.0.0.0/8", "10.0.0.0/8", "127.0.0.0/8", "169.254.0.0/16", "172.16.0.0/12",
+               "192.0.0.0/29", "192.0.0.170/31", "192.0.2.0/24", "192.168.0.0/16", "198.18.0.0/15",
+               "198.51.100.0/24", "203.0.113.0/24", "240.0.0.0/4", "255.255.255.255/32"]
+_V4_SHARED = int(ipaddress.ip_network("100.64.0.0/10").network_address) >> 22   # Shared address space, never global.
+
+_V4_STARTS = [int(ipaddress.ip_network(net).network_address) for net in _V4_PRIVATE]
+_V4_ENDS = [int(ipaddress.ip_network(net).broadcast_address) for net in _V4_PRIVATE]
+
+_OCTETS = [str(octet) for octet in range(256)]
+_V4_ALL = 0xFFFFFFFF
+_V6_ALL = (1 << 128) - 1
+
+
+def _v4_str(value):
+    return ".".join((_OCTETS[value >> 24], _OCTETS[(value >> 16) & 255],
+                     _OCTETS[(value >> 8) & 255], _OCTETS[value & 255]))
+
+
+def _v6_str(value):
+    # ipaddress formatting, inet_ntop writes some prefixes in dotted IPv4 form.
+    return str(ipaddress.IPv6Address(value))
+
+
+def _v4_private(value):
+    idx = bisect.bisect_right(_V4_STARTS, value) - 1
+    return idx >= 0 and value <= _V4_ENDS[idx]
+
+
+def parsePrefix(text):
+    """Returns (version, address int, prefix length). A bare address is treated as a host route."""
+    address, _, length = text.strip().partition("/")
+    if ":" in address:
+        value = int.from_bytes(socket.inet_pton(socket.AF_INET6, address), "big")
+        version, bits = 6, 128
+    else:
+        value = int.from_bytes(socket.inet_pton(socket.AF_INET, address), "big")
+        version, bits = 4, 32
+    prefixlen = int(length) if length else bits
+    if not 0 <= prefixlen <= bits:
+        raise ValueError(f"Invalid prefix length in {text.strip()!r}")
+    return version, value, prefixlen
+
+
+def _v4_rows_python(prefixes, values, lengths):
+    for prefix, value, prefixlen in zip(prefixes, values, lengths):
+        hostmask = _V4_ALL >> prefixlen
+        netmask = _V4_ALL ^ hostmask
+        network = value & netmask
+        total = hostmask + 1
+        private = _v4_private(value)
+        yield [prefix, _v4_str(network), _v4_str(network | hostmask), _v4_str(netmask), _v4_str(hostmask),
+               str(private), str(not private and (value >> 22) != _V4_SHARED),
+               str(total), str(max(total - 2, 0))]
+
+
+def _v4_rows_numpy(prefixes, values, lengths):
+    """Mask, network, broadcast and flag math over the whole chunk at once."""
+    addr = np.array(values, dtype=np.uint64)
+    plen = np.array(lengths, dtype=np.uint64)
+    hostmask = np.uint64(_V4_ALL) >> plen
+    netmask = np.uint64(_V4_ALL) ^ hostmask
+    network = addr & netmask
+    broadcast = network | hostmask
+    total = hostmask + np.uint64(1)
+    usable = np.where(total > 2, total - np.uint64(2), np.uint64(0))
+
+    idx = np.searchsorted(np.array(_V4_STARTS, dtype=np.uint64), addr, side="right") - 1
+    private = (idx >= 0) & (addr <= np.array(_V4_ENDS, dtype=np.uint64)[np.maximum(idx, 0)])
+    shared = (addr >> np.uint64(22)) == np.uint64(_V4_SHARED)
+    public = ~private & ~shared
+
+    columns = zip(prefixes, network.tolist(), broadcast.tolist(), netmask.tolist(), hostmask.tolist(),
+                  private.tolist(), public.tolist(), total.tolist(), usable.tolist())
+    for prefix, net, bcast, mask, wild, priv, pub, tot, use in columns:
+        yield [prefix, _v4_str(net), _v4_str(bcast), _v4_str(mask), _v4_str(wild),
+               str(priv), str(pub), str(tot), str(use)]
+
+
+def _v6_rows(prefixes, values, lengths):
+    for prefix, value, prefixlen in zip(prefixes, values, lengths):
+        hostmask = _V6_ALL >> prefixlen
+        netmask = _V6_ALL ^ hostmask
+        network = value & netmask
+        total = hostmask + 1
+        # Flags straight from ipaddress, as networkEval does: IPv4-mapped (::ffff:0:0/96) addresses
+        # follow the embedded IPv4 address, which a fixed range table cannot express.
+        iface = ipaddress.IPv6Interface((value, prefixlen))
+        yield [prefix, _v6_str(network), _v6_str(network | hostmask), _v6_str(netmask), _v6_str(hostmask),
+               str(iface.is_private), str(iface.is_global), str(total), str(max(total - 2, 0))]
+
+
+def _evaluate_chunk(lines):
+    # Each family is evaluated in one pass; the positions put the rows back in input order.
+    v4 = ([], [], [])
+    v6 = ([], [], [])
+    positions = {4: [], 6: []}
+    for line in lines:
+        text = line.strip()
+        if not text or text.startswith("#"):
+            continue
+        try:
+            version, value, prefixlen = parsePrefix(text)
+        except (OSError, ValueError) as err:
+            logging.warning(f"Skipping {text!r}: {err}")
+            continue
+        target = v4 if version == 4 else v6
+        positions[version].append(len(positions[4]) + len(positions[6]))
+        target[0].append(text)
+        target[1].append(value)
+        target[2].append(prefixlen)
+
+    if not v6[0]:
+        yield from (_v4_rows_numpy if np is not None else _v4_rows_python)(*v4)
+        return
+    if not v4[0]:
+        yield from _v6_rows(*v6)
+        return
+    rows = [None] * (len(positions[4]) + len(positions[6]))
+    for position, row in zip(positions[4], (_v4_rows_numpy if np is not None else _v4_rows_python)(*v4)):
+        rows[position] = row
+    for position, row in zip(positions[6], _v6_rows(*v6)):
+        rows[position] = row
+    yield from rows
+
+
+def evaluateBatch(lines, chunk_size=CHUNK_SIZE):
+    """Yield one row (list ordered like FIELDS) per prefix, in input order, a chunk at a time.
+
+    Blank lines, comments and unparsable prefixes are skipped (with a warning).
+    """
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield from _evaluate_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from _evaluate_chunk(chunk)
+
+
+def writeCsv(rows, out):
+    writer = csv.writer(out)
+    writer.writerow(FIELDS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def writeJson(rows, out):
+    """JSON lines, one object per prefix."""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(dict(zip(FIELDS, row))))
+        out.write("\n")
+        count += 1
+    return count
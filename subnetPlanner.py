@@ -0,0 +1,231 @@
+"""
+Filename: subnetPlanner.py
+Description: Subnet planning: prefix aggregation, VLSM allocation and free space in a parent block.
+Author: Hunter R.
+Date: 2026-10-18
+"""
+
+import argparse
+import heapq
+import ipaddress
+import json
+import logging
+import socket
+import sys
+import time
+from subnetBatch import parsePrefix
+
+# ️ Configure logging
+logging.basicConfig(
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[logging.StreamHandler(sys.stderr)],
+    level=logging.INFO,
+)
+
+_BITS = {4: 32, 6: 128}
+
+
+def _range(prefix):
+    """Returns (version, first int, last int) for a prefix string. Host bits are ignored."""
+    version, address, prefixlen = parsePrefix(prefix)
+    size = 1 << (_BITS[version] - prefixlen)
+    start = address & ~(size - 1)
+    return version, start, start + size - 1
+
+
+def _format(version, start, prefixlen):
+    if version == 4:
+        return f"{socket.inet_ntoa(start.to_bytes(4, 'big'))}/{prefixlen}"
+    return f"{ipaddress.IPv6Address(start)}/{prefixlen}"
+
+
+def _range_to_blocks(start, end, bits):
+    """Split an inclusive integer range into the fewest aligned CIDR blocks as (start, prefixlen)."""
+    blocks = []
+    while start <= end:
+        size = start & -start if start else 1 << bits
+        while size > end - start + 1:
+            size >>= 1
+        blocks.append((start, bits - size.bit_length() + 1))
+        start += size
+    return blocks
+
+
+def _merge(ranges):
+    """Merge sorted (start, end) ranges that overlap or touch."""
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def aggregate(prefixes):
+    """Collapse a prefix list into the smallest equivalent list of supernets. IPv4 first, then IPv6."""
+    # IPv4 is parsed inline here rather than through _range(); on 100k prefixes the per-call
+    # overhead was most of the run time.
+    v4, v6 = [], []
+    inetPton = socket.inet_pton
+    fromBytes = int.from_bytes
+    for prefix in prefixes:
+        address, _, length = prefix.strip().partition('/')
+        if ':' in address:
+            version, start, end = _range(prefix)
+            (v4 if version == 4 else v6).append((start, end))
+            continue
+        prefixlen = int(length) if length else 32
+        if not 0 <= prefixlen <= 32:
+            raise ValueError(f"Invalid prefix length in {prefix.strip()!r}")
+        size = 1 << (32 - prefixlen)
+        start = fromBytes(inetPton(socket.AF_INET, address), 'big') & -size
+        v4.append((start, start + size - 1))
+
+    result = []
+    for version, ranges in ((4, v4), (6, v6)):
+        ranges.sort()
+        bits = _BITS[version]
+        for start, end in _merge(ranges):
+            result.extend(_format(version, block, length) for block, length in _range_to_blocks(start, end, bits))
+    return result
+
+
+def _free_blocks(parent, used):
+    """Returns (version, [(start, prefixlen), ...]) for the parts of parent not covered by used."""
+    version, parentStart, parentEnd = _range(parent)
+    ranges = []
+    for prefix in used:
+        usedVersion, start, end = _range(prefix)
+        if usedVersion == version and end >= parentStart and start <= parentEnd:
+            ranges.append((max(start, parentStart), min(end, parentEnd)))
+    ranges.sort()
+
+    free = []
+    cursor = parentStart
+    for start, end in _merge(ranges):
+        if start > cursor:
+            free.append((cursor, start - 1))
+        cursor = max(cursor, end + 1)
+    if cursor <= parentEnd:
+        free.append((cursor, parentEnd))
+
+    bits = _BITS[version]
+    return version, [block for start, end in free for block in _range_to_blocks(start, end, bits)]
+
+
+def freeSpace(parent, used=()):
+    """Blocks inside parent not covered by any used prefix. Used prefixes outside parent are ignored."""
+    version, blocks = _free_blocks(parent, used)
+    return [_format(version, start, length) for start, length in blocks]
+
+
+def prefixForHosts(hosts, version=4):
+    """Longest prefix length with room for the given number of usable hosts."""
+    if hosts < 1:
+        raise ValueError(f"hosts must be at least 1, got {hosts}")
+    # IPv4 loses the network and broadcast addresses, IPv6 only the Subnet-Router anycast address.
+    needed = hosts + (2 if version == 4 else 1)
+    return _BITS[version] - max(needed - 1, 1).bit_length()
+
+
+def vlsm(parent, requirements, used=()):
+    """Carve parent into subnets for a list of host-count requirements.
+
+    requirements is a list of host counts or (name, hosts) pairs. Largest requests are placed first
+    with a buddy allocator over the free space (one heap of free block starts per prefix length), so
+    each allocation is O(log n). Returns one dict per requirement, in input order; requirements that
+    do not fit get a prefix of None.
+    """
+    version, blocks = _free_blocks(parent, used)
+    bits = _BITS[version]
+
+    free = {}
+    for start, length in blocks:
+        free.setdefault(length, []).append(start)
+    for starts in free.values():
+        heapq.heapify(starts)
+
+    requests = []
+    for idx, item in enumerate(requirements):
+        name, hosts = item if isinstance(item, (tuple, list)) else (str(item), item)
+        requests.append((idx, name, int(hosts)))
+    order = sorted(requests, key=lambda item: (-item[2], item[0]))
+
+    results = [None] * len(requests)
+    for idx, name, hosts in order:
+        length = prefixForHosts(hosts, version)
+        result = {'name': name, 'hosts': hosts, 'prefix': None, 'usable': 0}
+        results[idx] = result
+        if length < 0:
+            continue
+        # Smallest free block that still fits, lowest address first.
+        candidates = [blockLen for blockLen, starts in free.items() if starts and blockLen <= length]
+        if not candidates:
+            continue
+        blockLen = max(candidates)
+        start = heapq.heappop(free[blockLen])
+        # Split down to the requested size, returning the upper buddies to the free heaps.
+        while blockLen < length:
+            blockLen += 1
+            heapq.heappush(free.setdefault(blockLen, []), start + (1 << (bits - blockLen)))
+        size = 1 << (bits - length)
+        result['prefix'] = _format(version, start, length)
+        # Same counting as HostRange: /31, /32, /127 and /128 use every address.
+        result['usable'] = size - (2 if version == 4 else 1) if size > 2 else size
+    return results
+
+
+def main():
+    """Main Function."""
+    startTime = time.perf_counter()
+    parser = argparse.ArgumentParser(prog='subnetPlanner.py',
+                                     add_help=True,
+                                     description='Aggregate prefixes, plan VLSM allocations and find free space.',
+                                     epilog='\nEnd of the help text.')
+    subParser = parser.add_subparsers(title='subcommands', dest='command', required=True)
+    agg_parser = subParser.add_parser('aggregate', help='Collapse a prefix list (file or stdin) into supernets.')
+    agg_parser.add_argument('prefixes', nargs='?', default='-', help='File with one prefix per line. Default = stdin')
+    free_parser = subParser.add_parser('free', help='List free blocks in a parent given used prefixes.')
+    free_parser.add_argument('parent', type=str, help='Parent block, e.g. 10.0.0.0/16')
+    free_parser.add_argument('used', nargs='?', default='-', help='File with used prefixes. Default = stdin')
+    vlsm_parser = subParser.add_parser('vlsm', help='Allocate subnets for "name,hosts" requirements.')
+    vlsm_parser.add_argument('parent', type=str, help='Parent block, e.g. 10.0.0.0/16')
+    vlsm_parser.add_argument('requirements', nargs='?', default='-', help='File with "name,hosts" per line. Default = stdin')
+    vlsm_parser.add_argument('-u', '--used', metavar='<file>', dest='used', help='[Optional] File with prefixes already in use.')
+    args = parser.parse_args()
+
+    def readLines(path):
+        handle = sys.stdin if path == '-' else open(path, 'r')
+        try:
+            return [line.strip() for line in handle if line.strip() and not line.startswith('#')]
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+    if args.command == 'aggregate':
+        for prefix in aggregate(readLines(args.prefixes)):
+            print(prefix)
+    elif args.command == 'free':
+        for prefix in freeSpace(args.parent, readLines(args.used)):
+            print(prefix)
+    else:
+        requirements = []
+        for line in readLines(args.requirements):
+            name, _, hosts = line.rpartition(',')
+            requirements.append((name or hosts, int(hosts)))
+        used = readLines(args.used) if args.used else ()
+        for result in vlsm(args.parent, requirements, used):
+            print(json.dumps(result))
+
+    logging.info(f'Finished {args.command} in {time.perf_counter() - startTime:.4f}s')
+    logging.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logging.warning("Interrupted by user.")
+        sys.exit(0)